@@ -0,0 +1,335 @@
+"""
+Versão assíncrona da pilha de recursos, para rodar dentro de um event loop:
+centenas de transferências concorrentes compartilham uma única thread.
+Reaproveita o cache em memória e o cache em disco da versão síncrona.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, TypeVar
+
+from exceptions import ChecksumMismatchError
+from network_model import NetworkModel
+from resource_service import (
+    DEFAULT_CHUNK_SIZE,
+    CacheStats,
+    DiskResourceCache,
+    DownloadResult,
+    ResourceCache,
+    filename_for_url,
+    iter_slices,
+    unique_filenames,
+)
+
+T = TypeVar("T")
+
+
+async def write_chunks_async(chunks: AsyncIterator[bytes], path: Path) -> str:
+    """
+    Grava os pedaços em `path` e retorna o SHA-256 calculado durante a escrita.
+    As escritas locais são curtas e feitas na própria thread do loop; só a
+    espera pela rede é que cede a vez.
+    """
+    hasher = hashlib.sha256()
+    with open(path, "wb") as f:
+        async for chunk in chunks:
+            f.write(chunk)
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+class AsyncResourceService(ABC):
+    @abstractmethod
+    async def upload(self, name: str, data: bytes) -> str:
+        pass
+
+    @abstractmethod
+    async def download(self, url: str) -> bytes:
+        pass
+
+    async def download_stream(
+        self, url: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        for chunk in iter_slices(await self.download(url), chunk_size):
+            yield chunk
+
+    async def get_checksum(self, url: str) -> str | None:
+        return None
+
+    async def download_to_path(self, url: str, path: Path) -> str:
+        return await write_chunks_async(self.download_stream(url), path)
+
+
+class AsyncMockResourceService(AsyncResourceService):
+    network: NetworkModel
+
+    def __init__(self, network: NetworkModel | None = None):
+        # Mesmos tempos padrão do MockResourceService
+        self.network = network or NetworkModel(latency=1.0, transfer_overhead=4.0)
+        self._store: Dict[str, bytes] = {}
+        self._checksums: Dict[str, str] = {}
+
+    async def upload(self, name: str, data: bytes) -> str:
+        key = hashlib.sha256((name + str(time.time())).encode()).hexdigest()
+        url = f"https://mock.storage/{key}/{name}"
+
+        print("⏳ Conectando ao serviço de armazenamento...")
+        await self.network.transfer_async(
+            f"upload:{name}",
+            len(data),
+            on_connected=lambda: print("⬆️ Fazendo upload do recurso..."),
+        )
+
+        # Só fica visível para downloads depois que a transferência termina
+        self._store[url] = data
+        self._checksums[url] = hashlib.sha256(data).hexdigest()
+
+        print("✅ Upload concluído.")
+
+        return url
+
+    async def download(self, url: str) -> bytes:
+        data = self._store.get(url)
+
+        def connected():
+            if data is None:
+                raise FileNotFoundError(f"resource not found at {url}")
+
+            print("⬇️ Fazendo download do recurso...")
+
+        print("⏳ Conectando ao serviço de armazenamento...")
+        await self.network.transfer_async(
+            f"download:{filename_for_url(url)}",
+            len(data) if data is not None else 0,
+            on_connected=connected,
+        )
+
+        print("✅ Download concluído.")
+
+        return data
+
+    async def get_checksum(self, url: str) -> str | None:
+        return self._checksums.get(url)
+
+
+class AsyncCachedResourceProxy(AsyncResourceService):
+    """
+    Mesmo comportamento do CachedResourceProxy: memória, depois disco, depois
+    upstream, com pedidos concorrentes pela mesma URL agrupados em uma única
+    task. O acesso ao cache em disco roda em threads auxiliares para não
+    bloquear o loop.
+    """
+
+    def __init__(
+        self,
+        upstream: AsyncResourceService,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float | None = None,
+        disk_cache: DiskResourceCache | None = None,
+        max_item_bytes: int = 16 * 1024 * 1024,
+    ):
+        self._upstream = upstream
+        self._cache = ResourceCache(max_bytes, default_ttl=ttl)
+        self._disk_cache = disk_cache
+        self.max_item_bytes = max_item_bytes
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    async def upload(self, name: str, data: bytes) -> str:
+        return await self._upstream.upload(name, data)
+
+    async def get_checksum(self, url: str) -> str | None:
+        return await self._upstream.get_checksum(url)
+
+    def is_cached(self, url: str) -> bool:
+        if self._cache.contains(url):
+            return True
+
+        return self._disk_cache is not None and self._disk_cache.contains(url)
+
+    async def _single_flight(self, key: str, load: Callable[[], Awaitable[T]]) -> T:
+        """
+        Só o primeiro pedido por `key` cria a task; os demais aguardam a mesma.
+        O shield impede que o cancelamento de um pedido cancele os outros.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self._cache.stats.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url: str) -> bytes:
+        async def load() -> bytes:
+            data = await self._upstream.download(url)
+            self._cache.put(url, data)
+            if self._disk_cache is not None:
+                await asyncio.to_thread(self._disk_cache.put, url, data)
+            return data
+
+        return await self._single_flight(url, load)
+
+    async def _fill_disk_cache(self, disk_cache: DiskResourceCache, url: str) -> str:
+        async def load() -> str:
+            tmp_path = disk_cache.temp_path()
+            try:
+                digest = await write_chunks_async(self._stream_upstream(url), tmp_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+            await asyncio.to_thread(disk_cache.put_file, url, tmp_path, digest)
+            return digest
+
+        return await self._single_flight(f"disk:{url}", load)
+
+    async def _stream_upstream(
+        self, url: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        buffer: bytearray | None = bytearray()
+        async for chunk in self._upstream.download_stream(url, chunk_size):
+            if buffer is not None:
+                if len(buffer) + len(chunk) > self.max_item_bytes:
+                    buffer = None
+                else:
+                    buffer += chunk
+            yield chunk
+
+        if buffer is not None:
+            self._cache.put(url, bytes(buffer))
+
+    async def download(self, url: str) -> bytes:
+        data = self._cache.get(url)
+        if data is not None:
+            return data
+
+        if self._disk_cache is not None:
+            data = await asyncio.to_thread(self._disk_cache.read, url)
+            if data is not None:
+                self._cache.put(url, data)
+                return data
+
+        return await self._fetch(url)
+
+    async def download_to_path(self, url: str, path: Path) -> str:
+        data = self._cache.get(url)
+        if data is not None:
+            path.write_bytes(data)
+            return hashlib.sha256(data).hexdigest()
+
+        if self._disk_cache is None:
+            # Junta-se a um download da mesma URL que já esteja em andamento
+            data = await self._fetch(url)
+            path.write_bytes(data)
+            return hashlib.sha256(data).hexdigest()
+
+        digest = await asyncio.to_thread(self._disk_cache.copy_to, url, path)
+        if digest is None:
+            await self._fill_disk_cache(self._disk_cache, url)
+            digest = await asyncio.to_thread(self._disk_cache.copy_to, url, path)
+
+        return digest
+
+    def clear_cache(self):
+        """Limpa apenas o cache em memória; o cache em disco é persistente."""
+        self._cache.clear()
+
+
+class AsyncResourceToFileAdapter:
+    download_folder: Path
+    max_concurrency: int
+
+    def __init__(
+        self,
+        service: AsyncResourceService,
+        download_folder: str = "./resources",
+        max_concurrency: int = 64,
+    ):
+        self._service = service
+        self.set_download_folder(download_folder)
+        self.max_concurrency = max_concurrency
+
+    def set_download_folder(self, folder: str):
+        self.download_folder = Path(folder).resolve()
+        self.download_folder.mkdir(parents=True, exist_ok=True)
+
+    async def upload_from_path(self, str_path: str) -> str:
+        path = Path(str_path).resolve()
+
+        if not path.exists():
+            raise FileNotFoundError("O arquivo não existe.")
+
+        if path.is_dir():
+            raise ValueError("O path representa um diretório.")
+
+        data = await asyncio.to_thread(path.read_bytes)
+        return await self._service.upload(path.name, data)
+
+    async def download_to_folder(
+        self, url: str, checksum: str | None = None, filename: str | None = None
+    ) -> Path:
+        filename = filename or filename_for_url(url)
+        path = self.download_folder / filename
+
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.download_folder, prefix=f".{filename}.", suffix=".part"
+        )
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            digest = await self._service.download_to_path(url, tmp_path)
+            expected = checksum or await self._service.get_checksum(url)
+            if expected is not None and digest != expected:
+                raise ChecksumMismatchError(url, expected, digest)
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return path
+
+    async def download_many(
+        self,
+        urls: Iterable[str],
+        max_concurrency: int | None = None,
+        progress: Callable[[DownloadResult, int, int], None] | None = None,
+    ) -> list[DownloadResult]:
+        """Equivalente assíncrono de ResourceToFileAdapter.download_many."""
+        unique_urls = list(dict.fromkeys(urls))
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        filenames = unique_filenames(unique_urls)
+
+        async def timed_download(url: str) -> DownloadResult:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    path = await self.download_to_folder(url, filename=filenames[url])
+                except Exception as e:
+                    return DownloadResult(
+                        url, error=e, seconds=time.perf_counter() - start
+                    )
+
+                return DownloadResult(url, path, seconds=time.perf_counter() - start)
+
+        results: dict[str, DownloadResult] = {}
+        tasks = [asyncio.ensure_future(timed_download(url)) for url in unique_urls]
+        for done, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+            result = await next_result
+            results[result.url] = result
+            if progress:
+                progress(result, done, len(unique_urls))
+
+        return [results[url] for url in unique_urls]
@@ -0,0 +1,487 @@
+"""
+Log de auditoria dos menus em JSON Lines, com um índice esparso ao lado de
+cada arquivo (app.log.idx) para consultas por período e por usuário sem ler o
+arquivo inteiro.
+
+Uso: python audit_log.py [--since DATA] [--until DATA] [--user ID] [--log PATH]
+"""
+
+import argparse
+import atexit
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+from config import (
+    LOG_BACKUP_COUNT,
+    LOG_BATCH_SIZE,
+    LOG_FILE_PATH,
+    LOG_FLUSH_INTERVAL,
+    LOG_INDEX_BLOCK_SIZE,
+    LOG_MAX_BYTES,
+    LOG_ROTATE_INTERVAL,
+)
+
+
+def index_path_for(log_path: Path) -> Path:
+    return log_path.with_name(f"{log_path.name}.idx")
+
+
+@dataclass(slots=True)
+class IndexBlock:
+    """Um trecho contíguo do log: [offset, end) em bytes."""
+
+    offset: int
+    end: int = 0
+    count: int = 0
+    min_ts: float = float("inf")
+    max_ts: float = float("-inf")
+    users: set[int] = field(default_factory=set)
+
+    def add(self, record: dict[str, Any], end: int):
+        self.end = end
+        self.count += 1
+        ts = record.get("ts")
+        if isinstance(ts, (int, float)):
+            self.min_ts = min(self.min_ts, ts)
+            self.max_ts = max(self.max_ts, ts)
+        if isinstance(record.get("user_id"), int):
+            self.users.add(record["user_id"])
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "offset": self.offset,
+                "end": self.end,
+                "count": self.count,
+                "min_ts": self.min_ts if self.count else None,
+                "max_ts": self.max_ts if self.count else None,
+                "users": sorted(self.users),
+            }
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "IndexBlock":
+        record = json.loads(line)
+        return cls(
+            offset=record["offset"],
+            end=record["end"],
+            count=record["count"],
+            min_ts=record["min_ts"] if record["min_ts"] is not None else float("inf"),
+            max_ts=record["max_ts"] if record["max_ts"] is not None else float("-inf"),
+            users=set(record["users"]),
+        )
+
+
+def read_index(log_path: Path) -> list[IndexBlock]:
+    """Blocos do índice que ainda batem com o log (um índice truncado é aceito)."""
+    path = index_path_for(log_path)
+    if not path.exists():
+        return []
+
+    size = log_path.stat().st_size if log_path.exists() else 0
+    blocks: list[IndexBlock] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+
+            block = IndexBlock.from_json(line)
+            if block.end > size or (blocks and block.offset != blocks[-1].end):
+                break
+            blocks.append(block)
+
+    return blocks
+
+
+def parse_records(data: bytes, offset: int) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    """Registros de um trecho do log, com o offset do fim de cada linha."""
+    for line in data.splitlines(keepends=True):
+        offset += len(line)
+        if not line.endswith(b"\n"):
+            break
+
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # Linhas no formato antigo, em texto livre
+            record = None
+
+        yield offset, record if isinstance(record, dict) else None
+
+
+class AuditLogger:
+    """
+    Log de auditoria com escrita em segundo plano. `log` só enfileira o
+    registro; uma thread grava os registros em lotes de até `batch_size`, no
+    máximo `flush_interval` segundos depois de chegarem, mantendo o arquivo
+    aberto entre os lotes. A cada `index_block_size` registros, uma entrada é
+    acrescentada ao índice. O arquivo e seu índice são rotacionados (app.log.1,
+    app.log.2, ...) ao passar de `max_bytes` ou depois de `rotate_interval`
+    segundos.
+    """
+
+    path: Path
+    flush_interval: float
+    batch_size: int
+    index_block_size: int
+    max_bytes: int | None
+    rotate_interval: float | None
+    backup_count: int
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 100,
+        index_block_size: int = 256,
+        max_bytes: int | None = 10 * 1024 * 1024,
+        rotate_interval: float | None = None,
+        backup_count: int = 5,
+    ):
+        self.path = Path(path).resolve()
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.index_block_size = index_block_size
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+
+        self._queue: queue.SimpleQueue[dict[str, Any] | threading.Event | None] = (
+            queue.SimpleQueue()
+        )
+        self._file = None
+        self._index_file = None
+        self._block: IndexBlock | None = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+        self._thread.start()
+
+    def log(self, record: dict[str, Any]):
+        if self._closed:
+            raise RuntimeError("O log de auditoria já foi encerrado.")
+
+        self._queue.put(record)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Espera os registros enfileirados até aqui chegarem ao disco."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Grava o que falta e encerra a thread. Chamado também na saída."""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        batch: list[dict[str, Any]] = []
+        waiters: list[threading.Event] = []
+        deadline: float | None = None
+        running = True
+
+        while running:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = {}
+
+            if item is None:
+                running = False
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item:
+                batch.append(item)
+                deadline = deadline or time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or waiters or not running):
+                self._write(batch)
+                batch = []
+                deadline = None
+
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+        self._close_files()
+
+    def _open(self):
+        blocks = read_index(self.path)
+        indexed_end = blocks[-1].end if blocks else 0
+
+        # Reescreve o índice só com os blocos válidos e indexa o que ficou de fora
+        with open(index_path_for(self.path), "w", encoding="utf-8") as f:
+            for block in blocks:
+                f.write(block.to_json() + "\n")
+        self._index_file = open(index_path_for(self.path), "a", encoding="utf-8")
+        self._block = None
+
+        self._size = indexed_end
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                f.seek(indexed_end)
+                tail = f.read()
+            for end, record in parse_records(tail, indexed_end):
+                self._add_to_block(record or {}, self._size, end)
+                self._size = end
+
+        self._file = open(self.path, "ab")
+        # Uma linha interrompida no meio da escrita é descartada
+        self._file.truncate(self._size)
+        self._opened_at = time.time()
+
+    def _add_to_block(self, record: dict[str, Any], start: int, end: int):
+        if self._block is None:
+            self._block = IndexBlock(offset=start, end=start)
+
+        self._block.add(record, end)
+        if self._block.count >= self.index_block_size:
+            self._index_file.write(self._block.to_json() + "\n")
+            self._block = None
+
+    def _write(self, records: list[dict[str, Any]]):
+        lines = [
+            json.dumps(record, ensure_ascii=False).encode() + b"\n" for record in records
+        ]
+        if self._should_rotate(sum(len(line) for line in lines)):
+            self._rotate()
+
+        if self._file is None:
+            self._open()
+
+        self._file.write(b"".join(lines))
+        self._file.flush()
+
+        for record, line in zip(records, lines):
+            self._add_to_block(record, self._size, self._size + len(line))
+            self._size += len(line)
+        self._index_file.flush()
+
+    def _should_rotate(self, n_bytes: int) -> bool:
+        if not self.path.exists():
+            return False
+
+        if self.max_bytes is not None:
+            size = self.path.stat().st_size
+            if size > 0 and size + n_bytes > self.max_bytes:
+                return True
+
+        # O intervalo conta a partir de quando este processo abriu o arquivo
+        if self.rotate_interval is not None and self._opened_at:
+            if time.time() - self._opened_at >= self.rotate_interval:
+                return True
+
+        return False
+
+    def _close_files(self):
+        if self._index_file is not None:
+            if self._block is not None:
+                self._index_file.write(self._block.to_json() + "\n")
+                self._block = None
+            self._index_file.close()
+            self._index_file = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        self._close_files()
+
+        paths = [self.path] + [
+            self.path.with_name(f"{self.path.name}.{i}")
+            for i in range(1, self.backup_count + 1)
+        ]
+        for old in (paths[-1], index_path_for(paths[-1])):
+            old.unlink(missing_ok=True)
+
+        for i in range(len(paths) - 2, -1, -1):
+            for src, dst in (
+                (paths[i], paths[i + 1]),
+                (index_path_for(paths[i]), index_path_for(paths[i + 1])),
+            ):
+                if src.exists():
+                    os.replace(src, dst)
+
+
+class AuditLogReader:
+    """
+    Consultas sobre o log e seus arquivos rotacionados, do mais antigo para o
+    mais novo. Por período, a busca binária no índice acha os blocos que podem
+    conter o intervalo; por usuário, só os blocos onde ele aparece são lidos.
+    O trecho final, ainda não indexado, é lido por inteiro.
+    """
+
+    path: Path
+
+    def __init__(self, path: str = LOG_FILE_PATH):
+        self.path = Path(path).resolve()
+
+    def log_files(self) -> list[Path]:
+        rotated = []
+        i = 1
+        while (candidate := self.path.with_name(f"{self.path.name}.{i}")).exists():
+            rotated.append(candidate)
+            i += 1
+
+        files = list(reversed(rotated))
+        if self.path.exists():
+            files.append(self.path)
+
+        return files
+
+    def query(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        user_id: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        for log_path in self.log_files():
+            yield from self._query_file(log_path, since, until, user_id)
+
+    def _select_blocks(
+        self,
+        blocks: list[IndexBlock],
+        since: float | None,
+        until: float | None,
+        user_id: int | None,
+    ) -> list[IndexBlock]:
+        first, last = 0, len(blocks)
+
+        # Os registros estão quase em ordem (o carimbo é do momento da escolha,
+        # não da escrita), então a busca usa o máximo acumulado até cada bloco
+        # e o mínimo acumulado a partir dele, que são monotônicos
+        if since is not None:
+            running_max = [0.0] * len(blocks)
+            current = float("-inf")
+            for i, block in enumerate(blocks):
+                current = max(current, block.max_ts)
+                running_max[i] = current
+            first = bisect.bisect_left(running_max, since)
+
+        if until is not None:
+            suffix_min = [0.0] * len(blocks)
+            current = float("inf")
+            for i in range(len(blocks) - 1, -1, -1):
+                current = min(current, blocks[i].min_ts)
+                suffix_min[i] = current
+            last = bisect.bisect_right(suffix_min, until)
+
+        return [
+            block
+            for block in blocks[first:last]
+            if user_id is None or user_id in block.users
+        ]
+
+    def _query_file(
+        self,
+        log_path: Path,
+        since: float | None,
+        until: float | None,
+        user_id: int | None,
+    ) -> Iterator[dict[str, Any]]:
+        blocks = read_index(log_path)
+        selected = self._select_blocks(blocks, since, until, user_id)
+        indexed_end = blocks[-1].end if blocks else 0
+
+        with open(log_path, "rb") as f:
+            for block in selected:
+                f.seek(block.offset)
+                data = f.read(block.end - block.offset)
+                yield from self._filter(data, block.offset, since, until, user_id)
+
+            f.seek(indexed_end)
+            yield from self._filter(f.read(), indexed_end, since, until, user_id)
+
+    def _filter(
+        self,
+        data: bytes,
+        offset: int,
+        since: float | None,
+        until: float | None,
+        user_id: int | None,
+    ) -> Iterator[dict[str, Any]]:
+        for _, record in parse_records(data, offset):
+            if record is None or not isinstance(record.get("ts"), (int, float)):
+                continue
+            if since is not None and record["ts"] < since:
+                continue
+            if until is not None and record["ts"] > until:
+                continue
+            if user_id is not None and record.get("user_id") != user_id:
+                continue
+
+            yield record
+
+
+_audit_logger: AuditLogger | None = None
+_audit_logger_lock = threading.Lock()
+
+
+def get_audit_logger() -> AuditLogger:
+    global _audit_logger
+
+    with _audit_logger_lock:
+        if _audit_logger is None:
+            _audit_logger = AuditLogger(
+                LOG_FILE_PATH,
+                flush_interval=LOG_FLUSH_INTERVAL,
+                batch_size=LOG_BATCH_SIZE,
+                index_block_size=LOG_INDEX_BLOCK_SIZE,
+                max_bytes=LOG_MAX_BYTES,
+                rotate_interval=LOG_ROTATE_INTERVAL,
+                backup_count=LOG_BACKUP_COUNT,
+            )
+            atexit.register(_audit_logger.close)
+
+        return _audit_logger
+
+
+def format_record(record: dict[str, Any]) -> str:
+    when = datetime.fromtimestamp(record["ts"])
+    return (
+        f"[{record.get('user')} (ID: {record.get('user_id')})@{when}] escolheu a "
+        f"opção {record.get('option')} no menu {record.get('menu')}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta ao log de auditoria")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    parser.add_argument("--user", type=int)
+    parser.add_argument("--log", default=LOG_FILE_PATH)
+    args = parser.parse_args()
+
+    reader = AuditLogReader(args.log)
+    records = reader.query(
+        since=args.since.timestamp() if args.since else None,
+        until=args.until.timestamp() if args.until else None,
+        user_id=args.user,
+    )
+
+    n_records = 0
+    for record in records:
+        print(format_record(record))
+        n_records += 1
+
+    print(f"\n{n_records} registros encontrados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Mede os bytes por entidade do modelo de domínio com __slots__ em comparação ao
+layout anterior (dataclass com __dict__ por instância).
+
+Uso: python -m benchmarks.memory [n_alunos]
+"""
+
+import datetime
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from system import Attendance, Employee, Exam, SchoolClass, Student, StudentExamResult
+
+DEFAULT_N = 1_000_000
+
+
+@dataclass
+class LegacyStudent:
+    id: int = field(init=False)
+    name: str
+    password: str
+
+
+@dataclass
+class LegacySchoolClass:
+    id: int = field(init=False)
+    name: str
+    teacher: Any
+    schedule: datetime.time
+    students: list[Any] = field(default_factory=list)
+    resources: list[Any] = field(default_factory=list)
+    n_classes_total: int = 0
+    n_classes_passed: int = 0
+
+
+@dataclass
+class LegacyExam:
+    id: int = field(init=False)
+    sclass: Any
+    name: str
+    date: datetime.date
+    grades_submitted: bool = False
+
+
+@dataclass
+class LegacyExamResult:
+    student: Any
+    exam: Any
+    grade: float | None = None
+
+
+@dataclass
+class LegacyAttendance:
+    student: Any
+    sclass: Any
+    date: datetime.date = field(default_factory=datetime.date.today)
+
+
+def measure(factory: Callable[[int], Any], n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    items = [factory(i) for i in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Desconta a própria lista que guarda as instâncias
+    list_overhead = sys.getsizeof(items)
+    del items
+    return (current - list_overhead) / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_N
+
+    # Strings e referências compartilhadas, para medir só o custo das instâncias
+    name, password = "Aluno", "123"
+    teacher = Employee("Professor", "123", "professor", "Matemática")
+    nine = datetime.time(9)
+    sclass = SchoolClass(name="Turma", teacher=teacher, schedule=nine)
+    exam = Exam(sclass, "Prova", datetime.date.today())
+    student = Student(name, password)
+    today = datetime.date.today()
+
+    def slotted_student(i: int) -> Student:
+        s = Student(name, password)
+        s.id = i
+        return s
+
+    def legacy_student(i: int) -> LegacyStudent:
+        s = LegacyStudent(name, password)
+        s.id = i
+        return s
+
+    def slotted_sclass(i: int) -> SchoolClass:
+        c = SchoolClass(name="Turma", teacher=teacher, schedule=nine)
+        c.id = i
+        return c
+
+    def legacy_sclass(i: int) -> LegacySchoolClass:
+        c = LegacySchoolClass(name="Turma", teacher=teacher, schedule=nine)
+        c.id = i
+        return c
+
+    def slotted_exam(i: int) -> Exam:
+        e = Exam(sclass, "Prova", today)
+        e.id = i
+        return e
+
+    def legacy_exam(i: int) -> LegacyExam:
+        e = LegacyExam(sclass, "Prova", today)
+        e.id = i
+        return e
+
+    cases = [
+        ("Student", legacy_student, slotted_student),
+        ("SchoolClass", legacy_sclass, slotted_sclass),
+        ("Exam", legacy_exam, slotted_exam),
+        (
+            "StudentExamResult",
+            lambda _: LegacyExamResult(student, exam),
+            lambda _: StudentExamResult(student, exam),
+        ),
+        (
+            "Attendance",
+            lambda _: LegacyAttendance(student, sclass, today),
+            lambda _: Attendance(student, sclass, today),
+        ),
+    ]
+
+    print(f"Entidades por caso: {n:,}")
+    print(f"{'entidade':<20}{'antes (B)':>12}{'depois (B)':>12}{'redução':>10}")
+    for label, legacy, slotted in cases:
+        before = measure(legacy, n)
+        after = measure(slotted, n)
+        print(f"{label:<20}{before:>12.1f}{after:>12.1f}{1 - after / before:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Mede o pipeline de recursos (cache, streaming e downloads paralelos) sobre o
+MockResourceService com um modelo de rede configurável. Os cenários
+sequenciais rodam em relógio virtual (tempos exatos e reproduzíveis com a
+mesma semente); os paralelos, em relógio real acelerado `--speedup` vezes, o
+que também multiplica o custo local (escrita e hash dos arquivos).
+
+Uso: python -m benchmarks.resources [--files N] [--size BYTES] [--seed S]
+         [--latency S] [--bandwidth B/s] [--jitter S] [--failure-rate P]
+         [--max-connections N] [--speedup X]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import tracemalloc
+from typing import Callable
+
+from network_model import Clock, NetworkModel, ScaledClock, VirtualClock
+from resource_service import (
+    CachedResourceProxy,
+    DiskResourceCache,
+    MockResourceService,
+    ResourceToFileAdapter,
+)
+
+
+def build_network(args: argparse.Namespace, clock: Clock) -> NetworkModel:
+    return NetworkModel(
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        jitter=args.jitter,
+        jitter_distribution="exponential",
+        failure_rate=args.failure_rate,
+        max_connections=args.max_connections,
+        seed=args.seed,
+        clock=clock,
+    )
+
+
+def publish(service: MockResourceService, n_files: int, size: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    urls = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n_files):
+            data = rng.randbytes(size)
+            while True:
+                try:
+                    urls.append(service.upload(f"material-{i}.bin", data))
+                    break
+                except ConnectionError:
+                    continue
+
+    return urls
+
+
+def timed(clock: Clock, fn: Callable[[], int]) -> tuple[float, int]:
+    """Roda `fn` sem a saída do mock e retorna (tempo no relógio, falhas)."""
+    start = clock.sync() if isinstance(clock, VirtualClock) else clock.now()
+    with contextlib.redirect_stdout(io.StringIO()):
+        failures = fn()
+    end = clock.sync() if isinstance(clock, VirtualClock) else clock.now()
+    return end - start, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de recursos")
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--size", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0.08)
+    parser.add_argument("--bandwidth", type=float, default=12.5 * 1024 * 1024)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--max-connections", type=int, default=8)
+    parser.add_argument("--speedup", type=float, default=5.0)
+    args = parser.parse_args()
+
+    virtual_clock = VirtualClock()
+    service = MockResourceService(build_network(args, virtual_clock))
+    urls = publish(service, args.files, args.size, args.seed)
+    total_mb = args.files * args.size / 1024 / 1024
+
+    print(
+        f"{args.files} arquivos de {args.size / 1024 / 1024:.1f} MiB, latência "
+        f"{args.latency * 1000:.0f} ms, banda {args.bandwidth / 1024 / 1024:.1f} MiB/s, "
+        f"{args.max_connections} conexões, semente {args.seed}"
+    )
+    print(f"{'cenário':<36}{'tempo (s)':>12}{'MiB/s':>10}{'falhas':>8}")
+
+    def report(label: str, result: tuple[float, int]):
+        seconds, failures = result
+        throughput = f"{total_mb / seconds:.1f}" if seconds else "-"
+        print(f"{label:<36}{seconds:>12.2f}{throughput:>10}{failures:>8}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        downloads = os.path.join(folder, "downloads")
+        proxy = CachedResourceProxy(
+            service, disk_cache=DiskResourceCache(os.path.join(folder, "cache"))
+        )
+        adapter = ResourceToFileAdapter(proxy, downloads)
+
+        def sequential() -> int:
+            failures = 0
+            for url in urls:
+                try:
+                    adapter.download_to_folder(url)
+                except ConnectionError:
+                    failures += 1
+            return failures
+
+        report("sequencial, cache frio", timed(virtual_clock, sequential))
+        report("sequencial, cache quente", timed(virtual_clock, sequential))
+
+        scaled_clock = ScaledClock(args.speedup)
+        for workers in (1, 4, 16):
+            service.network = build_network(args, scaled_clock)
+            parallel_adapter = ResourceToFileAdapter(CachedResourceProxy(service), downloads)
+
+            def parallel() -> int:
+                results = parallel_adapter.download_many(urls, workers)
+                return sum(not result.ok for result in results)
+
+            report(f"download_many, {workers} workers", timed(scaled_clock, parallel))
+
+        # Pico de memória do download em partes, independente do tamanho
+        service.network = build_network(args, virtual_clock)
+        proxy = CachedResourceProxy(
+            service,
+            disk_cache=DiskResourceCache(os.path.join(folder, "stream-cache")),
+            max_item_bytes=0,
+        )
+        adapter = ResourceToFileAdapter(proxy, downloads)
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = adapter.download_to_folder(urls[0])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = path.stat().st_size
+        print(
+            f"\nPico de memória no download em partes: {peak / 1024 / 1024:.2f} MiB "
+            f"para um arquivo de {size / 1024 / 1024:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
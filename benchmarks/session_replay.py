@@ -0,0 +1,361 @@
+"""
+Teste de carga dos menus a partir do log de auditoria: as sessões gravadas
+(opções escolhidas por cada usuário em cada menu) são reproduzidas sem
+terminal por vários usuários virtuais em paralelo, e o relatório mostra a
+vazão e a latência p50/p95/p99 de cada opção.
+
+Os menus são chamados direto, sem o LogMenuDectorator, para a reprodução não
+voltar a ser gravada no log. O log só guarda a opção do menu; os pedidos de
+entrada seguintes (selecionar turma, digitar nota...) recebem "0" (Voltar)
+até `--max-answers` vezes e, depois disso, a opção é interrompida e contada
+como incompleta. Por padrão tudo roda no backend em memória, para a carga
+não alterar o banco de verdade.
+
+Uso: python -m benchmarks.session_replay [--log PATH] [--since ISO]
+         [--until ISO] [--users N] [--sessions N | --duration S]
+         [--pace X] [--session-gap S] [--max-answers N] [--backend B]
+         [--seed S]
+"""
+
+import argparse
+import builtins
+import contextlib
+import io
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+from audit_log import AuditLogReader
+from config import LOG_FILE_PATH
+from menu import UserMenuStrategy
+from menu.employee_menu import EmployeeMenuStrategy
+from menu.guardian_menu import GuardianMenuStrategy
+from menu.student_menu import StudentMenuStrategy
+from service import School
+from system import Employee, Guardian, Student, User
+
+MENUS: dict[str, tuple[type[UserMenuStrategy], type[User]]] = {
+    "StudentMenuStrategy": (StudentMenuStrategy, Student),
+    "EmployeeMenuStrategy": (EmployeeMenuStrategy, Employee),
+    "GuardianMenuStrategy": (GuardianMenuStrategy, Guardian),
+}
+
+
+class ScriptExhausted(BaseException):
+    """
+    A opção pediu mais entradas do que o roteiro tem. Herda de BaseException
+    para atravessar os `except Exception` e os laços de validação dos menus.
+    """
+
+
+@dataclass(slots=True)
+class Step:
+    option: str
+    delay: float = 0.0
+
+
+@dataclass
+class Session:
+    user_id: int
+    menu: str
+    steps: list[Step] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Sample:
+    menu: str
+    option: str
+    status: str
+    seconds: float
+
+
+class ScriptedConsole:
+    """
+    Troca `input`, `sys.stdout` e `os.system` por versões que olham a thread
+    atual: nas threads com roteiro, `input` responde pelo roteiro e `clear`
+    não roda; a saída de todas as threads, exceto a principal, é descartada
+    (inclusive a das threads de fundo de downloads e uploads).
+    """
+
+    def __init__(self, answer: str = "0", max_answers: int = 3):
+        self.answer = answer
+        self.max_answers = max_answers
+        self._local = threading.local()
+        self._original_input = builtins.input
+        self._original_stdout = sys.stdout
+        self._original_system = os.system
+
+    def _scripted(self) -> bool:
+        return getattr(self._local, "answers_left", None) is not None
+
+    def start_step(self):
+        self._local.answers_left = self.max_answers
+
+    def end_step(self):
+        self._local.answers_left = None
+
+    def input(self, prompt: Any = "") -> str:
+        if not self._scripted():
+            return self._original_input(prompt)
+
+        if self._local.answers_left <= 0:
+            raise ScriptExhausted()
+
+        self._local.answers_left -= 1
+        return self.answer
+
+    def write(self, text: str) -> int:
+        if threading.current_thread() is threading.main_thread():
+            return self._original_stdout.write(text)
+
+        return len(text)
+
+    def flush(self):
+        if threading.current_thread() is threading.main_thread():
+            self._original_stdout.flush()
+
+    def system(self, command: str) -> int:
+        if self._scripted():
+            return 0
+
+        return self._original_system(command)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._original_stdout, name)
+
+    @contextlib.contextmanager
+    def installed(self):
+        builtins.input = self.input
+        sys.stdout = self
+        os.system = self.system
+        try:
+            yield self
+        finally:
+            builtins.input = self._original_input
+            sys.stdout = self._original_stdout
+            os.system = self._original_system
+
+
+def load_sessions(
+    reader: AuditLogReader,
+    since: float | None = None,
+    until: float | None = None,
+    session_gap: float = 30 * 60,
+) -> list[Session]:
+    """
+    Agrupa os registros por usuário, em ordem de tempo, e abre uma nova
+    sessão quando o menu muda ou quando passa mais de `session_gap` segundos
+    entre duas escolhas.
+    """
+    by_user: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for record in reader.query(since=since, until=until):
+        if record.get("menu") in MENUS and record.get("user_id") is not None:
+            by_user[record["user_id"]].append(record)
+
+    sessions: list[Session] = []
+    for user_id, records in by_user.items():
+        records.sort(key=lambda r: r["ts"])
+        current: Session | None = None
+        last_ts = 0.0
+        for record in records:
+            gap = record["ts"] - last_ts
+            if current is None or record["menu"] != current.menu or gap > session_gap:
+                current = Session(user_id, record["menu"])
+                sessions.append(current)
+                gap = 0.0
+
+            current.steps.append(Step(str(record["option"]), gap))
+            last_ts = record["ts"]
+
+    return sessions
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo."""
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class SessionReplayer:
+    def __init__(
+        self,
+        school: School,
+        sessions: list[Session],
+        console: ScriptedConsole,
+        pace: float | None = None,
+        seed: int = 42,
+    ):
+        self.school = school
+        self.console = console
+        self.pace = pace
+        self.seed = seed
+        self.sessions: list[Session] = []
+        self.skipped: list[Session] = []
+        for session in sessions:
+            _, user_class = MENUS[session.menu]
+            user = school.user_repo.get_user(session.user_id)
+            if isinstance(user, user_class):
+                self.sessions.append(session)
+            else:
+                self.skipped.append(session)
+
+    def _build_menu(self, session: Session) -> UserMenuStrategy:
+        menu_class, _ = MENUS[session.menu]
+        menu = menu_class(self.school.user_repo.get_user(session.user_id))
+        menu.set_logged_user()
+        return menu
+
+    def _play(self, menu: UserMenuStrategy, session: Session, samples: list[Sample]):
+        for step in session.steps:
+            if self.pace and step.delay:
+                time.sleep(step.delay / self.pace)
+
+            self.console.start_step()
+            start = time.perf_counter()
+            try:
+                menu.match_option_to_function(step.option)
+                status = "ok"
+            except ScriptExhausted:
+                status = "incompleto"
+            except Exception:
+                status = "erro"
+            finally:
+                self.console.end_step()
+
+            samples.append(
+                Sample(session.menu, step.option, status, time.perf_counter() - start)
+            )
+
+    def _run_user(
+        self,
+        index: int,
+        should_stop: Callable[[int], bool],
+        samples: list[Sample],
+    ):
+        rng = random.Random(f"{self.seed}:{index}")
+        menus: dict[tuple[int, str], UserMenuStrategy] = {}
+        played = 0
+        while not should_stop(played):
+            session = rng.choice(self.sessions)
+            key = (session.user_id, session.menu)
+            if key not in menus:
+                menus[key] = self._build_menu(session)
+
+            self._play(menus[key], session, samples)
+            played += 1
+
+    def run(
+        self,
+        n_users: int,
+        sessions_per_user: int | None = None,
+        duration: float | None = None,
+    ) -> tuple[list[Sample], float]:
+        """
+        Roda `n_users` usuários virtuais, cada um sorteando sessões até jogar
+        `sessions_per_user` delas ou até passar `duration` segundos. Retorna
+        as amostras e o tempo total de parede.
+        """
+        if not self.sessions:
+            return [], 0.0
+
+        deadline = time.perf_counter() + duration if duration else None
+
+        def should_stop(played: int) -> bool:
+            if deadline is not None:
+                return time.perf_counter() >= deadline
+            return played >= (sessions_per_user or 1)
+
+        samples_by_user: list[list[Sample]] = [[] for _ in range(n_users)]
+        threads = [
+            threading.Thread(
+                target=self._run_user,
+                args=(i, should_stop, samples_by_user[i]),
+                name=f"virtual-user-{i}",
+            )
+            for i in range(n_users)
+        ]
+
+        start = time.perf_counter()
+        with self.console.installed():
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+
+        return [sample for samples in samples_by_user for sample in samples], elapsed
+
+
+def report(samples: list[Sample], elapsed: float):
+    by_option: dict[tuple[str, str], list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_option[(sample.menu, sample.option)].append(sample)
+
+    throughput = f"{len(samples) / elapsed:.1f}" if elapsed else "-"
+    print(f"{len(samples)} opções em {elapsed:.2f} s ({throughput} opções/s)\n")
+    print(
+        f"{'menu':<24}{'opção':>6}{'n':>8}{'incompl.':>10}{'erros':>7}"
+        f"{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}"
+    )
+    for (menu, option), group in sorted(by_option.items()):
+        seconds = sorted(sample.seconds * 1000 for sample in group)
+        incomplete = sum(sample.status == "incompleto" for sample in group)
+        errors = sum(sample.status == "erro" for sample in group)
+        print(
+            f"{menu:<24}{option:>6}{len(group):>8}{incomplete:>10}{errors:>7}"
+            f"{percentile(seconds, 50):>11.2f}{percentile(seconds, 95):>11.2f}"
+            f"{percentile(seconds, 99):>11.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprodução de sessões gravadas")
+    parser.add_argument("--log", default=LOG_FILE_PATH)
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--duration", type=float)
+    parser.add_argument("--pace", type=float)
+    parser.add_argument("--session-gap", type=float, default=30 * 60)
+    parser.add_argument("--max-answers", type=int, default=3)
+    parser.add_argument("--backend", default="memory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sessions = load_sessions(
+        AuditLogReader(args.log),
+        since=args.since.timestamp() if args.since else None,
+        until=args.until.timestamp() if args.until else None,
+        session_gap=args.session_gap,
+    )
+    if not sessions:
+        print(f"Nenhuma sessão encontrada em {args.log}.")
+        return
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        school = School(args.backend)
+
+    console = ScriptedConsole(max_answers=args.max_answers)
+    replayer = SessionReplayer(school, sessions, console, args.pace, args.seed)
+    print(
+        f"{len(replayer.sessions)} sessões gravadas, {len(replayer.skipped)} "
+        f"ignoradas (usuário inexistente), {args.users} usuários virtuais, "
+        f"backend {args.backend}"
+    )
+    if not replayer.sessions:
+        return
+
+    samples, elapsed = replayer.run(args.users, args.sessions, args.duration)
+    report(samples, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,20 @@
 LOG_FILE_PATH = "./app.log"
+LOG_FLUSH_INTERVAL = 1.0
+LOG_BATCH_SIZE = 100
+LOG_INDEX_BLOCK_SIZE = 256
+LOG_MAX_BYTES: int | None = 10 * 1024 * 1024
+LOG_ROTATE_INTERVAL: float | None = 24 * 60 * 60
+LOG_BACKUP_COUNT = 5
+REPOSITORY_BACKEND = "memory"
+DATABASE_PATH = "./school.db"
+JOURNAL_FOLDER = "./data"
+SNAPSHOT_INTERVAL = 1000
+RESOURCE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESOURCE_CACHE_TTL: float | None = None
+RESOURCE_CACHE_MAX_ITEM_BYTES = 16 * 1024 * 1024
+RESOURCE_DISK_CACHE_FOLDER = "./.resource_cache"
+UPLOAD_MANIFEST_FOLDER = "./.uploads"
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_WORKERS = 4
+UPLOAD_QUEUE_WORKERS = 2
+PREFETCH_MAX_CONCURRENCY = 2
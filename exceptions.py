@@ -17,3 +17,10 @@ class UserCreationError(Exception):
 
 class InvalidExamDate(Exception):
     pass
+
+
+class ChecksumMismatchError(Exception):
+    def __init__(self, url: str, expected: str, actual: str):
+        super().__init__(
+            f"Checksum inválido para {url}: esperado {expected}, obtido {actual}."
+        )
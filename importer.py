@@ -0,0 +1,311 @@
+"""
+Importação em lote de usuários, turmas, matrículas e notas a partir de arquivos
+CSV ou JSONL, sem interação com o usuário.
+
+Uso: python importer.py {users,classes,enrollments,grades} arquivo
+         --backend {sqlite,journal} [--batch-size N]
+
+O banco de destino não recebe os dados de demonstração quando está vazio.
+
+Colunas esperadas:
+    users:       type (student/employee/guardian), name, password,
+                 position, subject (funcionários), student_id (responsáveis)
+    classes:     name, teacher_id, schedule (HH:MM), n_classes_total
+    enrollments: sclass_id, student_id
+    grades:      exam_id, student_id, grade
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+from builder import EmployeeBuilder, SchoolClassBuilder
+from service import School
+from system import Employee, Guardian, SchoolClass, Student, User
+
+T = TypeVar("T")
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+
+
+@dataclass
+class ImportReport:
+    kind: str
+    rows: int = 0
+    imported: int = 0
+    errors: list[str] = field(default_factory=list)
+    n_errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line: int, message: str):
+        self.n_errors += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"linha {line}: {message}")
+
+
+Row = tuple[int, dict[str, Any]]
+
+
+def read_rows(path: Path) -> Iterator[Row]:
+    """
+    Lê as linhas de um CSV ou JSONL uma a uma, sem carregar o arquivo todo,
+    junto com o número da linha no arquivo (para os relatórios de erro).
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif path.suffix in {".jsonl", ".ndjson"}:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            raise ValueError(f"Formato não suportado: {path.suffix}")
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _optional(row: dict[str, Any], key: str) -> str | None:
+    value = row.get(key)
+    if value is None or str(value).strip() == "":
+        return None
+
+    return str(value).strip()
+
+
+class BulkImporter:
+    school: School
+    batch_size: int
+    progress: Callable[[ImportReport], None] | None
+
+    def __init__(
+        self,
+        school: School,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        progress: Callable[[ImportReport], None] | None = None,
+    ):
+        self.school = school
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def _run(
+        self,
+        kind: str,
+        rows: Iterable[Row],
+        import_batch: Callable[[list[Row], ImportReport], None],
+    ) -> ImportReport:
+        report = ImportReport(kind)
+        start = time.perf_counter()
+
+        for batch in batched(rows, self.batch_size):
+            import_batch(batch, report)
+            report.rows += len(batch)
+            report.seconds = time.perf_counter() - start
+
+            if self.progress:
+                self.progress(report)
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def import_users(self, rows: Iterable[Row]) -> ImportReport:
+        return self._run("users", rows, self._import_users_batch)
+
+    def _build_user(self, row: dict[str, Any]) -> User:
+        name = _optional(row, "name")
+        password = _optional(row, "password")
+        if not name or not password:
+            raise ValueError("Nome e senha são obrigatórios")
+
+        match _optional(row, "type"):
+            case "student":
+                return Student(name=name, password=password)
+            case "employee":
+                builder = EmployeeBuilder().set_name(name).set_password(password)
+                position = _optional(row, "position") or ""
+                if position == "professor":
+                    builder = builder.as_professor(_optional(row, "subject") or "")
+                elif position == "diretor":
+                    builder = builder.as_director()
+                else:
+                    builder = builder.as_staff(position)
+                return builder.build()
+            case "guardian":
+                student_id = int(_optional(row, "student_id") or 0)
+                student = self.school.user_repo.get_user(student_id)
+                if not isinstance(student, Student):
+                    raise LookupError(student_id)
+                return Guardian(name=name, password=password, student=student)
+            case other:
+                raise ValueError(f"Tipo de usuário inválido: {other}")
+
+    def _import_users_batch(self, batch: list[Row], report: ImportReport):
+        pending: list[User] = []
+        for line, row in batch:
+            try:
+                user = self._build_user(row)
+            except LookupError:
+                # O aluno do responsável pode estar no mesmo lote, ainda não gravado
+                self._flush_users(pending, report)
+                pending = []
+                try:
+                    user = self._build_user(row)
+                except LookupError:
+                    report.add_error(line, "Aluno do responsável não encontrado")
+                    continue
+                except ValueError as e:
+                    report.add_error(line, str(e))
+                    continue
+            except ValueError as e:
+                report.add_error(line, str(e))
+                continue
+
+            pending.append(user)
+
+        self._flush_users(pending, report)
+
+    def _flush_users(self, users: list[User], report: ImportReport):
+        if users:
+            self.school.register_users(users)
+            report.imported += len(users)
+
+    def import_classes(self, rows: Iterable[Row]) -> ImportReport:
+        return self._run("classes", rows, self._import_classes_batch)
+
+    def _import_classes_batch(self, batch: list[Row], report: ImportReport):
+        sclasses: list[SchoolClass] = []
+        for line, row in batch:
+            try:
+                teacher = self.school.user_repo.get_user(int(row["teacher_id"]))
+                if not isinstance(teacher, Employee):
+                    raise ValueError("Professor não encontrado")
+                schedule = datetime.time.fromisoformat(str(row["schedule"]).strip())
+                builder = (
+                    SchoolClassBuilder()
+                    .set_name(_optional(row, "name") or "")
+                    .set_teacher(teacher)
+                    .set_schedule(schedule)
+                    .set_n_classes_total(int(_optional(row, "n_classes_total") or 0))
+                )
+                sclasses.append(builder.build())
+            except (KeyError, TypeError, ValueError) as e:
+                report.add_error(line, str(e))
+
+        if sclasses:
+            self.school.criar_turmas(sclasses)
+            report.imported += len(sclasses)
+
+    def import_enrollments(self, rows: Iterable[Row]) -> ImportReport:
+        return self._run("enrollments", rows, self._import_enrollments_batch)
+
+    def _import_enrollments_batch(self, batch: list[Row], report: ImportReport):
+        by_sclass: dict[int, dict[int, Student]] = {}
+        for line, row in batch:
+            try:
+                sclass_id = int(row["sclass_id"])
+                student = self.school.user_repo.get_user(int(row["student_id"]))
+                sclass = self.school.sclass_repo.get_sclass(sclass_id)
+                if not isinstance(student, Student) or sclass is None:
+                    raise ValueError("Aluno ou turma não encontrados")
+                if self.school.sclass_repo.is_student_in_sclass(student.id, sclass_id):
+                    raise ValueError("Aluno já matriculado na turma")
+            except (KeyError, TypeError, ValueError) as e:
+                report.add_error(line, str(e))
+                continue
+
+            by_sclass.setdefault(sclass_id, {})[student.id] = student
+
+        for sclass_id, students in by_sclass.items():
+            sclass = self.school.sclass_repo.get_sclass(sclass_id)
+            self.school.add_students_to_sclass(sclass, list(students.values()))
+            report.imported += len(students)
+
+    def import_grades(self, rows: Iterable[Row]) -> ImportReport:
+        return self._run("grades", rows, self._import_grades_batch)
+
+    def _import_grades_batch(self, batch: list[Row], report: ImportReport):
+        by_exam: dict[int, dict[Student, float]] = {}
+        first_line: dict[int, int] = {}
+        for line, row in batch:
+            try:
+                exam_id = int(row["exam_id"])
+                student = self.school.user_repo.get_user(int(row["student_id"]))
+                grade = float(row["grade"])
+                if self.school.exam_repo.get_exam(exam_id) is None:
+                    raise ValueError("Prova não encontrada")
+                if not isinstance(student, Student):
+                    raise ValueError("Aluno não encontrado")
+                if grade < 0 or grade > 10:
+                    raise ValueError("A nota deve estar entre 0.0 e 10.0")
+            except (KeyError, TypeError, ValueError) as e:
+                report.add_error(line, str(e))
+                continue
+
+            by_exam.setdefault(exam_id, {})[student] = grade
+            first_line.setdefault(exam_id, line)
+
+        for exam_id, grades in by_exam.items():
+            exam = self.school.exam_repo.get_exam(exam_id)
+            try:
+                self.school.lancar_notas(exam, grades)
+                report.imported += len(grades)
+            except ValueError as e:
+                report.add_error(
+                    first_line[exam_id], f"notas da prova {exam_id} recusadas: {e}"
+                )
+
+
+def print_progress(report: ImportReport):
+    print(
+        f"⏳ {report.rows} linhas processadas ({report.rows_per_second:.0f} linhas/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação em lote de dados")
+    parser.add_argument("kind", choices=["users", "classes", "enrollments", "grades"])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--backend", choices=["sqlite", "journal"], required=True)
+    args = parser.parse_args()
+
+    school = School(args.backend, seed=False)
+    importer = BulkImporter(school, args.batch_size, progress=print_progress)
+    import_fn = {
+        "users": importer.import_users,
+        "classes": importer.import_classes,
+        "enrollments": importer.import_enrollments,
+        "grades": importer.import_grades,
+    }[args.kind]
+
+    report = import_fn(read_rows(args.path))
+    school.checkpoint()
+
+    print(
+        f"\n✅ {report.imported} de {report.rows} linhas importadas em "
+        f"{report.seconds:.2f}s ({report.rows_per_second:.0f} linhas/s)"
+    )
+    if report.n_errors:
+        print(f"❌ {report.n_errors} linhas com erro:")
+        for error in report.errors:
+            print(f"    {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -121,7 +121,7 @@ def visualizar_turma(sclass: SchoolClass):
         print("Nenhum aluno matriculado.")
 
     print("\nProvas:")
-    exams = school.exam_repo.get_class_exams(sclass.id)
+    exams = school.get_class_exams(sclass)
     if exams:
         for exam in exams:
             status = ""
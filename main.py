@@ -21,6 +21,7 @@ class App:
     def start(self):
         while True:
             os.system("clear")
+            self.school.process_completions()
             print("=== 🎓 Sistema de Gestão Escolar ===\n")
             print("1 - Login")
             print("0 - Sair")
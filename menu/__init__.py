@@ -19,6 +19,7 @@ class UserMenuStrategy(ABC):
 
         while True:
             os.system("clear")
+            self.school.process_completions()
             print(self.get_menu_title())
 
             self.show_menu_options()
@@ -1,6 +1,6 @@
-from datetime import datetime
+import time
 from menu import UserMenuStrategy
-from config import LOG_FILE_PATH
+from audit_log import get_audit_logger
 
 
 class MenuDecorator(UserMenuStrategy):
@@ -27,11 +27,15 @@ class MenuDecorator(UserMenuStrategy):
 
 class LogMenuDectorator(MenuDecorator):
     def match_option_to_function(self, selected_option: str) -> bool:
-        user_name = self.menu.logged_user.name
-        menu_name = self.menu.__class__.__name__
-        log = f"[{user_name}@{datetime.now()}] escolheu a opção {selected_option} no menu {menu_name}\n"
-
-        with open(LOG_FILE_PATH, "a") as f:
-            f.write(log)
+        user = self.menu.logged_user
+        get_audit_logger().log(
+            {
+                "ts": time.time(),
+                "user_id": user.id,
+                "user": user.name,
+                "menu": self.menu.__class__.__name__,
+                "option": selected_option,
+            }
+        )
 
         return self.menu.match_option_to_function(selected_option)
@@ -1,5 +1,5 @@
 from menu import UserMenuStrategy
-from system import Employee, Exam, Resource
+from system import Employee, Exam
 from utils import read_date, read_non_empty_string, select_item
 from input_helpers import (
     add_student_to_class,
@@ -40,6 +40,7 @@ class EmployeeMenuStrategy(UserMenuStrategy):
             print("10. Criar atividade extracurricular")
             print("11. Adicionar alunos a atividades")
             print("12. Cadastrar usuários")
+            print("13. Acompanhar envios de materiais")
         else:
             print("1. Registrar presença")
 
@@ -53,7 +54,7 @@ class EmployeeMenuStrategy(UserMenuStrategy):
                 )
 
                 if sclass is not None:
-                    sclass.n_classes_passed += 1
+                    self.school.registrar_aula(sclass)
                     print("Registre a presença de cada aluno:")
                     for student in sclass.students:
                         while True:
@@ -97,17 +98,18 @@ class EmployeeMenuStrategy(UserMenuStrategy):
                     while True:
                         try:
                             str_path = read_non_empty_string("Path do material")
-                            url = self.school.resource_adapter.upload_from_path(
-                                str_path
+                            job = self.school.publicar_material(
+                                name, str_path, [sclass]
                             )
                             break
                         except (FileNotFoundError, ValueError):
                             print("Arquivo inválido. Tente novamente.")
                             continue
 
-                    resource = Resource(name, url)
-
-                    self.school.distribuir_material(resource, sclass)
+                    print(
+                        f"⏳ Envio #{job.id} iniciado. O material aparece como "
+                        "'processando' até o upload terminar."
+                    )
 
                 return True
 
@@ -194,8 +196,7 @@ class EmployeeMenuStrategy(UserMenuStrategy):
 
                 if eca:
                     students = add_student_to_eca(eca)
-                    for student in students:
-                        eca.students.append(student)
+                    self.school.add_students_to_eca(eca, students)
                 else:
                     return True
 
@@ -206,6 +207,11 @@ class EmployeeMenuStrategy(UserMenuStrategy):
 
                 return True
 
+            case "13":
+                self.school.consultar_envios()
+
+                return True
+
             case _:
                 print("Opção inválida.")
 
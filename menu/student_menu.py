@@ -22,6 +22,7 @@ class StudentMenuStrategy(UserMenuStrategy):
         print("3. Ver provas e notas")
         print("4. Ver presenças")
         print("5. Ver atividades extracurriculares")
+        print("6. Baixar todos os materiais")
 
     def match_option_to_function(self, selected_option: str) -> bool:
         match selected_option:
@@ -35,6 +36,8 @@ class StudentMenuStrategy(UserMenuStrategy):
                 self.school.consultar_presencas(self.student)
             case "5":
                 self.school.consultar_ecas(self.student)
+            case "6":
+                self.school.baixar_todos_materiais(self.student)
             case _:
                 print("Opção inválida.")
 
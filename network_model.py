@@ -0,0 +1,306 @@
+"""
+Modelo de rede do MockResourceService e do AsyncMockResourceService:
+latência, banda, jitter, falhas e limite de conexões, sobre um relógio real ou
+virtual.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+
+
+class Clock(ABC):
+    @abstractmethod
+    def now(self) -> float:
+        pass
+
+    @abstractmethod
+    def sleep(self, seconds: float):
+        pass
+
+    async def sleep_async(self, seconds: float):
+        """Versão de `sleep` para event loops: cede a vez em vez de bloquear."""
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+
+class RealClock(Clock):
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class ScaledClock(Clock):
+    """
+    Relógio real acelerado: `sleep(s)` espera s / `speedup` segundos e `now`
+    anda na mesma escala. Para cenários com várias threads, em que a ordem real
+    de execução importa.
+    """
+
+    speedup: float
+
+    def __init__(self, speedup: float = 20.0):
+        self.speedup = speedup
+
+    def now(self) -> float:
+        return time.monotonic() * self.speedup
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds / self.speedup)
+
+    async def sleep_async(self, seconds: float):
+        if seconds > 0:
+            await asyncio.sleep(seconds / self.speedup)
+
+
+class VirtualClock(Clock):
+    """
+    Relógio simulado: `sleep` não espera, só avança o tempo da thread que o
+    chamou. Cada thread começa no instante base do relógio e `sync` leva esse
+    instante para o da thread mais atrasada. É exato e reproduzível em fluxos
+    sequenciais; com várias threads, quem pega cada tarefa depende do
+    escalonamento real, que não vê o tempo simulado (use ScaledClock).
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._base = start
+        self._latest = start
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        return getattr(self._local, "now", self._base)
+
+    def sleep(self, seconds: float):
+        current = self.now() + max(seconds, 0.0)
+        self._local.now = current
+        with self._lock:
+            self._latest = max(self._latest, current)
+
+    async def sleep_async(self, seconds: float):
+        # As tasks de um loop dividem a thread e, portanto, o mesmo tempo
+        self.sleep(seconds)
+
+    def sync(self) -> float:
+        with self._lock:
+            self._base = self._latest
+
+        self._local.now = self._base
+        return self._base
+
+
+class NetworkModel:
+    """
+    Custo de cada operação: `latency` + jitter para conectar e, nas que
+    transmitem dados, `transfer_overhead` + bytes / `bandwidth`. Com
+    `max_connections`, as operações além do limite esperam a primeira conexão
+    que se liberar. O sorteio de jitter e falhas de cada operação depende só da
+    semente, da chave da operação e de quantas vezes ela já foi feita, então o
+    resultado não muda com a ordem em que as threads chegam.
+    """
+
+    JITTER_DISTRIBUTIONS = {"uniform", "normal", "exponential"}
+
+    latency: float
+    transfer_overhead: float
+    bandwidth: float | None
+    jitter: float
+    jitter_distribution: str
+    failure_rate: float
+    max_connections: int | None
+    seed: int | None
+    clock: Clock
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        transfer_overhead: float = 0.0,
+        bandwidth: float | None = None,
+        jitter: float = 0.0,
+        jitter_distribution: str = "uniform",
+        failure_rate: float = 0.0,
+        max_connections: int | None = None,
+        seed: int | None = None,
+        clock: Clock | None = None,
+    ):
+        if jitter_distribution not in self.JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Distribuição de jitter inválida: {jitter_distribution}")
+
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("A taxa de falhas deve estar entre 0.0 e 1.0")
+
+        self.latency = latency
+        self.transfer_overhead = transfer_overhead
+        self.bandwidth = bandwidth
+        self.jitter = jitter
+        self.jitter_distribution = jitter_distribution
+        self.failure_rate = failure_rate
+        self.max_connections = max_connections
+        self.seed = seed
+        self.clock = clock or RealClock()
+
+        self._attempts: dict[str, int] = {}
+        # Uma entrada (livre a partir de, reserva) por conexão; a reserva
+        # identifica quem ocupa a conexão para a liberação antecipada
+        self._reservations = itertools.count()
+        self._free_at: list[tuple[float, int]] = [
+            (0.0, next(self._reservations)) for _ in range(max_connections or 0)
+        ]
+        self._lock = threading.Lock()
+
+    def _rng(self, key: str) -> random.Random:
+        attempt = self._attempts.get(key, 0)
+        self._attempts[key] = attempt + 1
+
+        if self.seed is None:
+            return random.Random()
+
+        return random.Random(f"{self.seed}:{key}:{attempt}")
+
+    def _sample_jitter(self, rng: random.Random) -> float:
+        if not self.jitter:
+            return 0.0
+
+        match self.jitter_distribution:
+            case "normal":
+                return max(rng.gauss(0.0, self.jitter), -self.latency)
+            case "exponential":
+                return rng.expovariate(1 / self.jitter)
+            case _:
+                return rng.uniform(0.0, self.jitter)
+
+    def _release_early(self, reservation: int, released_at: float):
+        if not self.max_connections:
+            return
+
+        with self._lock:
+            for index, (_, owner) in enumerate(self._free_at):
+                if owner == reservation:
+                    self._free_at[index] = (released_at, reservation)
+                    heapq.heapify(self._free_at)
+                    return
+
+        # Outra operação já pegou a conexão contando com o horário reservado
+
+    def _reserve(
+        self, key: str, n_bytes: int, with_body: bool, overhead: float | None
+    ) -> tuple[float, float, float, bool, int]:
+        """
+        Sorteia o custo da operação e reserva a conexão. Retorna quanto esperar
+        até conectar, o instante da conexão, o tempo de transmissão, se a
+        operação falha e a reserva.
+        """
+        with self._lock:
+            rng = self._rng(key)
+            connect = self.latency + self._sample_jitter(rng)
+            failed = rng.random() < self.failure_rate
+            send = 0.0
+            if with_body and not failed:
+                send = self.transfer_overhead if overhead is None else overhead
+                if self.bandwidth:
+                    send += n_bytes / self.bandwidth
+
+            now = self.clock.now()
+            start = now
+            reservation = -1
+            if self.max_connections:
+                free_at, _ = heapq.heappop(self._free_at)
+                start = max(now, free_at)
+                reservation = next(self._reservations)
+                heapq.heappush(self._free_at, (start + connect + send, reservation))
+
+        return start + connect - now, start + connect, send, failed, reservation
+
+    def _connected(
+        self,
+        key: str,
+        failed: bool,
+        on_connected: Callable[[], None] | None,
+        reservation: int,
+        connected_at: float,
+    ):
+        if failed:
+            raise ConnectionError(f"Falha simulada de rede em {key}")
+
+        if on_connected is not None:
+            try:
+                on_connected()
+            except BaseException:
+                self._release_early(reservation, connected_at)
+                raise
+
+    def _run(
+        self,
+        key: str,
+        n_bytes: int,
+        with_body: bool,
+        on_connected: Callable[[], None] | None,
+        overhead: float | None = None,
+    ):
+        wait, connected_at, send, failed, reservation = self._reserve(
+            key, n_bytes, with_body, overhead
+        )
+        self.clock.sleep(wait)
+        self._connected(key, failed, on_connected, reservation, connected_at)
+        self.clock.sleep(send)
+
+    async def _run_async(
+        self,
+        key: str,
+        n_bytes: int,
+        with_body: bool,
+        on_connected: Callable[[], None] | None,
+        overhead: float | None = None,
+    ):
+        wait, connected_at, send, failed, reservation = self._reserve(
+            key, n_bytes, with_body, overhead
+        )
+        await self.clock.sleep_async(wait)
+        self._connected(key, failed, on_connected, reservation, connected_at)
+        await self.clock.sleep_async(send)
+
+    def request(self, key: str, on_connected: Callable[[], None] | None = None):
+        """Uma ida e volta sem corpo: só latência e jitter."""
+        self._run(key, 0, False, on_connected)
+
+    def transfer(
+        self,
+        key: str,
+        n_bytes: int,
+        on_connected: Callable[[], None] | None = None,
+        overhead: float | None = None,
+    ):
+        """
+        Ocupa uma conexão pelo tempo da operação: conexão (latência e jitter),
+        depois `transfer_overhead` (ou `overhead`, se informado) mais o tempo
+        de transmitir `n_bytes`.
+        `on_connected` roda entre as duas fases; se lançar uma exceção, a
+        conexão é liberada e a transmissão não acontece. Uma falha sorteada
+        lança ConnectionError logo após a conexão.
+        """
+        self._run(key, n_bytes, True, on_connected, overhead)
+
+    async def request_async(
+        self, key: str, on_connected: Callable[[], None] | None = None
+    ):
+        """Como `request`, mas esperando sem bloquear o event loop."""
+        await self._run_async(key, 0, False, on_connected)
+
+    async def transfer_async(
+        self,
+        key: str,
+        n_bytes: int,
+        on_connected: Callable[[], None] | None = None,
+        overhead: float | None = None,
+    ):
+        """Como `transfer`, mas esperando sem bloquear o event loop."""
+        await self._run_async(key, n_bytes, True, on_connected, overhead)
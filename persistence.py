@@ -0,0 +1,317 @@
+import datetime
+import json
+import mmap
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any, Iterator, Protocol
+
+from system import ECA, Employee, Exam, Guardian, Resource, SchoolClass, Student, User
+
+
+class Repositories(Protocol):
+    user_repo: Any
+    sclass_repo: Any
+    exam_repo: Any
+    attendance_repo: Any
+    eca_repo: Any
+
+
+def user_to_record(user: User) -> dict[str, Any]:
+    record: dict[str, Any] = {"name": user.name, "password": user.password}
+    if isinstance(user, Employee):
+        record.update(type="employee", position=user.position, subject=user.subject)
+    elif isinstance(user, Guardian):
+        record.update(type="guardian", student_id=user.student.id)
+    else:
+        record.update(type="student")
+
+    return record
+
+
+def user_from_record(record: dict[str, Any], repos: Repositories) -> User:
+    match record["type"]:
+        case "employee":
+            return Employee(
+                record["name"], record["password"], record["position"], record["subject"]
+            )
+        case "guardian":
+            student = repos.user_repo.get_user(record["student_id"])
+            return Guardian(record["name"], record["password"], student)
+        case _:
+            return Student(record["name"], record["password"])
+
+
+def sclass_to_record(sclass: SchoolClass) -> dict[str, Any]:
+    return {
+        "name": sclass.name,
+        "teacher_id": sclass.teacher.id,
+        "schedule": sclass.schedule.isoformat(),
+        "student_ids": [s.id for s in sclass.students],
+        "resources": [[r.name, r.url] for r in sclass.resources],
+        "n_classes_total": sclass.n_classes_total,
+        "n_classes_passed": sclass.n_classes_passed,
+    }
+
+
+def sclass_from_record(record: dict[str, Any], repos: Repositories) -> SchoolClass:
+    users = repos.user_repo
+    return SchoolClass(
+        name=record["name"],
+        teacher=users.get_user(record["teacher_id"]),
+        schedule=datetime.time.fromisoformat(record["schedule"]),
+        students=[users.get_user(s_id) for s_id in record["student_ids"]],
+        resources=[Resource(name, url) for name, url in record["resources"]],
+        n_classes_total=record["n_classes_total"],
+        n_classes_passed=record["n_classes_passed"],
+    )
+
+
+def enroll_students(
+    repos: Repositories,
+    sclass: SchoolClass,
+    students: list[Student],
+    n_classes_credited: int,
+):
+    """
+    Matricula os alunos na turma, cria os resultados deles nas provas já
+    existentes e credita as aulas já dadas. Usada tanto pela School quanto
+    pela reaplicação do journal, para as duas não divergirem. Alunos que já
+    estavam matriculados são ignorados, para não receberem o crédito de novo.
+    """
+    enrolled = repos.sclass_repo.add_students(sclass.id, students)
+
+    for exam in repos.exam_repo.get_class_exams(sclass.id):
+        grade = 10.0 if exam.grades_submitted else None
+        repos.exam_repo.register_grades(exam, enrolled, grade, force=True)
+
+    repos.attendance_repo.credit_attendance(enrolled, sclass, n_classes_credited)
+
+
+def record_rows(data: dict[str, Any]) -> int:
+    """
+    Quantas linhas um registro do journal representa: o tamanho de cada lista
+    que ele carrega (usuários, turmas, notas, alunos), ou 1.
+    """
+    return max(1, sum(len(value) for value in data.values() if isinstance(value, list)))
+
+
+def apply_record(repos: Repositories, op: str, data: dict[str, Any]):
+    """Reaplica nos repositórios uma operação registrada no journal."""
+    users = repos.user_repo
+    sclasses = repos.sclass_repo
+    exams = repos.exam_repo
+
+    match op:
+        case "register_user":
+            users.add_user(user_from_record(data, repos))
+        case "register_users":
+            # Responsáveis podem apontar para alunos do mesmo lote
+            for record in data["users"]:
+                users.add_user(user_from_record(record, repos))
+        case "criar_turma":
+            sclasses.create_sclass(sclass_from_record(data, repos))
+        case "criar_turmas":
+            for record in data["sclasses"]:
+                sclasses.create_sclass(sclass_from_record(record, repos))
+        case "add_students_to_sclass":
+            students = [users.get_user(s_id) for s_id in data["student_ids"]]
+            enroll_students(
+                repos,
+                sclasses.get_sclass(data["sclass_id"]),
+                students,
+                data["n_classes_credited"],
+            )
+        case "registrar_aula":
+            sclasses.register_class_given(data["sclass_id"])
+        case "registrar_presenca":
+            repos.attendance_repo.register_attendance(
+                users.get_user(data["student_id"]),
+                sclasses.get_sclass(data["sclass_id"]),
+                datetime.date.fromisoformat(data["date"]),
+            )
+        case "distribuir_material":
+            sclasses.add_resource(data["sclass_id"], Resource(data["name"], data["url"]))
+        case "agendar_prova":
+            exam = Exam(
+                sclasses.get_sclass(data["exam_sclass_id"]),
+                data["name"],
+                datetime.date.fromisoformat(data["date"]),
+            )
+            exams.create_exam(sclasses.get_sclass(data["sclass_id"]), exam)
+        case "lancar_nota":
+            exams.register_grade(
+                exams.get_exam(data["exam_id"]),
+                users.get_user(data["student_id"]),
+                data["grade"],
+            )
+        case "lancar_notas":
+            exam = exams.get_exam(data["exam_id"])
+            grades = {
+                users.get_user(student_id): grade
+                for student_id, grade in data["grades"]
+            }
+            exams.register_grade_sheet(exam, grades)
+        case "submit_grades":
+            exams.submit_grades(exams.get_exam(data["exam_id"]))
+        case "criar_atividade_extracurricular":
+            eca = ECA(
+                name=data["name"],
+                teacher=users.get_user(data["teacher_id"]),
+                schedule=datetime.time.fromisoformat(data["schedule"]),
+                students=[users.get_user(s_id) for s_id in data["student_ids"]],
+            )
+            repos.eca_repo.create_eca(eca)
+        case "add_students_to_eca":
+            students = [users.get_user(s_id) for s_id in data["student_ids"]]
+            repos.eca_repo.add_students(data["eca_id"], students)
+        case _:
+            raise ValueError(f"Operação desconhecida no journal: {op}")
+
+
+class SchoolStore:
+    """
+    Persistência dos repositórios em memória: um snapshot (pickle dos
+    repositórios) mais um journal append-only em JSON Lines com as operações
+    feitas depois dele. Cada registro tem um número de sequência e o snapshot
+    guarda o último número que já contém, então a reinicialização só reaplica a
+    cauda do journal. Um snapshot novo é sugerido a cada `snapshot_interval`
+    linhas (ver `record_rows`), e não registros, para que poucas importações
+    grandes também sejam compactadas.
+    """
+
+    SNAPSHOT_FILE = "snapshot.pickle"
+    JOURNAL_FILE = "journal.jsonl"
+
+    folder: Path
+    snapshot_interval: int
+    fsync: bool
+
+    def __init__(self, folder: str, snapshot_interval: int = 1000, fsync: bool = True):
+        self.folder = Path(folder).resolve()
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._rows_since_snapshot = 0
+        self._valid_journal_size = 0
+        self._journal = None
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.folder / self.SNAPSHOT_FILE
+
+    @property
+    def journal_path(self) -> Path:
+        return self.folder / self.JOURNAL_FILE
+
+    def load(self, repos: Repositories) -> bool:
+        """
+        Carrega o snapshot (via mmap) e reaplica o journal em `repos`.
+        Retorna False quando não havia nenhum estado salvo.
+        """
+        found = False
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    snapshot = pickle.loads(mm)
+
+            self._seq = snapshot["seq"]
+            for name, repo in snapshot["repos"].items():
+                setattr(repos, name, repo)
+            found = True
+
+        for seq, op, data in self._read_journal():
+            if seq <= self._seq:
+                continue
+
+            apply_record(repos, op, data)
+            self._seq = seq
+            self._rows_since_snapshot += record_rows(data)
+            found = True
+
+        # Descarta a linha interrompida, para o próximo registro não colar nela
+        if (
+            self.journal_path.exists()
+            and self.journal_path.stat().st_size > self._valid_journal_size
+        ):
+            os.truncate(self.journal_path, self._valid_journal_size)
+
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        return found
+
+    def _read_journal(self) -> Iterator[tuple[int, str, dict[str, Any]]]:
+        self._valid_journal_size = 0
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                # Uma linha sem '\n' foi interrompida no meio da escrita
+                if not line.endswith(b"\n"):
+                    break
+
+                record = json.loads(line)
+                self._valid_journal_size += len(line)
+                yield record["seq"], record["op"], record["data"]
+
+    def append(self, op: str, data: dict[str, Any]):
+        with self._lock:
+            if self._journal is None:
+                raise RuntimeError("O journal ainda não foi carregado.")
+
+            self._seq += 1
+            line = json.dumps({"seq": self._seq, "op": op, "data": data})
+            self._journal.write(line + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+
+            self._rows_since_snapshot += record_rows(data)
+
+    def should_checkpoint(self) -> bool:
+        return self._rows_since_snapshot >= self.snapshot_interval
+
+    def checkpoint(self, repos: Repositories):
+        """Grava um snapshot novo e descarta o journal que ele já cobre."""
+        with self._lock:
+            snapshot = {
+                "seq": self._seq,
+                "repos": {
+                    "user_repo": repos.user_repo,
+                    "sclass_repo": repos.sclass_repo,
+                    "exam_repo": repos.exam_repo,
+                    "attendance_repo": repos.attendance_repo,
+                    "eca_repo": repos.eca_repo,
+                },
+            }
+
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            if self._journal is not None:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+            self._rows_since_snapshot = 0
+
+    def close(self, repos: Repositories | None = None):
+        """
+        Fecha o journal. Com `repos`, grava antes um snapshot se houver
+        registros que ele ainda não cobre, para a próxima inicialização não
+        precisar reaplicá-los.
+        """
+        if repos is not None and self._journal is not None:
+            if self._rows_since_snapshot:
+                self.checkpoint(repos)
+
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
@@ -0,0 +1,88 @@
+"""
+Resultados das consultas da School. As consultas só leem os repositórios e
+devolvem estes objetos, sem imprimir nada; os menus, relatórios em lote e
+benchmarks formatam a partir deles.
+"""
+
+import datetime
+from dataclasses import dataclass
+from enum import StrEnum
+
+from system import ECA, Exam, Resource, SchoolClass, Student
+
+
+class ExamStatus(StrEnum):
+    SCHEDULED = "prova agendada"
+    NOT_GRADED = "nota não registrada"
+    GRADED = "nota registrada"
+
+
+@dataclass(slots=True)
+class ExamEntry:
+    exam: Exam
+    grade: float | None
+    status: ExamStatus
+
+    @classmethod
+    def from_grade(cls, exam: Exam, grade: float | None) -> "ExamEntry":
+        if exam.date > datetime.date.today():
+            status = ExamStatus.SCHEDULED
+        elif grade is None:
+            status = ExamStatus.NOT_GRADED
+        else:
+            status = ExamStatus.GRADED
+
+        return cls(exam, grade, status)
+
+    def describe(self) -> str:
+        if self.status is ExamStatus.GRADED:
+            return f"nota {self.grade}"
+
+        return str(self.status)
+
+
+@dataclass(slots=True)
+class ClassExams:
+    """Provas do aluno em uma turma, ordenadas por data."""
+
+    sclass: SchoolClass
+    exams: list[ExamEntry]
+
+
+@dataclass(slots=True)
+class ClassAttendance:
+    sclass: SchoolClass
+    attendance: float | None
+
+
+@dataclass(slots=True)
+class ClassSummary:
+    """Situação do aluno em uma turma; `exams` vem ordenado por data."""
+
+    sclass: SchoolClass
+    resources: list[Resource]
+    exams: list[ExamEntry]
+    attendance: float | None
+
+
+@dataclass(slots=True)
+class StudentDashboard:
+    student: Student
+    classes: list[ClassSummary]
+    ecas: list[ECA]
+
+
+@dataclass(slots=True)
+class GradebookRow:
+    """Notas do aluno na mesma ordem de `ClassGradebook.exams`."""
+
+    student: Student
+    grades: list[float | None]
+    attendance: float | None
+
+
+@dataclass(slots=True)
+class ClassGradebook:
+    sclass: SchoolClass
+    exams: list[Exam]
+    rows: list[GradebookRow]
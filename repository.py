@@ -1,9 +1,11 @@
-from itertools import count
-from typing import Iterator
+import datetime
+from array import array
+from typing import Generic, Iterable, Iterator, TypeVar
 
 from exceptions import InvalidCredentialsException
 from system import (
     ECA,
+    Activity,
     Attendance,
     Resource,
     SchoolClass,
@@ -14,26 +16,82 @@ from system import (
 )
 
 
+A = TypeVar("A", bound=Activity)
+
+
+class IdSequence:
+    """
+    Gerador de IDs sequenciais. Diferente de itertools.count, pode ser
+    serializado com pickle, o que permite salvar os repositórios em snapshots.
+    """
+
+    __next_id: int
+
+    def __init__(self, start: int = 1):
+        self.__next_id = start
+
+    def __iter__(self) -> "IdSequence":
+        return self
+
+    def __next__(self) -> int:
+        current = self.__next_id
+        self.__next_id += 1
+        return current
+
+
+class ActivityIndex(Generic[A]):
+    """
+    Índice secundário chave -> atividades (turmas ou ECAs).
+    As atividades de cada chave são mantidas na ordem de seus IDs.
+    """
+
+    __entries: dict[int, dict[int, A]]
+
+    def __init__(self):
+        self.__entries = {}
+
+    def add(self, key: int, activity: A):
+        self.__entries.setdefault(key, {})[activity.id] = activity
+
+    def get(self, key: int) -> list[A]:
+        bucket = self.__entries.get(key)
+        if not bucket:
+            return []
+
+        return [bucket[activity_id] for activity_id in sorted(bucket)]
+
+    def contains(self, key: int, activity_id: int) -> bool:
+        return activity_id in self.__entries.get(key, {})
+
+
 class UserRepository:
     __users: dict[int, User]
+    __users_by_name: dict[str, User]
+    __users_by_type: dict[type[User], list[User]]
     __id_counter: Iterator[int]
 
     def __init__(self):
         self.__users = {}
-        self.__id_counter = count(1)
+        self.__users_by_name = {}
+        self.__users_by_type = {}
+        self.__id_counter = IdSequence(1)
 
     def add_user(self, user: User) -> int:
         user_id = next(self.__id_counter)
         user.id = user_id
         self.__users.update({user_id: user})
+
+        # Em nomes repetidos, o login continua resolvendo para o primeiro cadastrado
+        self.__users_by_name.setdefault(user.name, user)
+        self.__users_by_type.setdefault(type(user), []).append(user)
+
         return user_id
 
+    def add_users(self, users: Iterable[User]) -> list[int]:
+        return [self.add_user(user) for user in users]
+
     def validate_user(self, name: str, password: str) -> User:
-        selected_user = None
-        for user in self.__users.values():
-            if user.name == name:
-                selected_user = user
-                break
+        selected_user = self.__users_by_name.get(name)
 
         if not selected_user:
             raise InvalidCredentialsException("Usuário não encontrado.")
@@ -43,61 +101,147 @@ class UserRepository:
 
         return selected_user
 
+    def get_user(self, user_id: int) -> User | None:
+        return self.__users.get(user_id)
+
+    def is_empty(self) -> bool:
+        return not self.__users
+
     def get_students(self) -> list[Student]:
-        return [user for user in self.__users.values() if isinstance(user, Student)]
+        return list(self.__users_by_type.get(Student, []))
 
 
 class SchoolClassRepository:
     __classes: dict[int, SchoolClass]
     __id_counter: Iterator[int]
+    __by_student: ActivityIndex[SchoolClass]
+    __by_teacher: ActivityIndex[SchoolClass]
 
     def __init__(self):
         self.__classes = {}
-        self.__id_counter = count(1)
+        self.__id_counter = IdSequence(1)
+        self.__by_student = ActivityIndex()
+        self.__by_teacher = ActivityIndex()
 
     def create_sclass(self, sclass: SchoolClass) -> int:
         sclass_id = next(self.__id_counter)
         sclass.id = sclass_id
         self.__classes.update({sclass_id: sclass})
+
+        self.__by_teacher.add(sclass.teacher.id, sclass)
+        for student in sclass.students:
+            self.__by_student.add(student.id, sclass)
+
         return sclass_id
 
+    def get_sclass(self, sclass_id: int) -> SchoolClass | None:
+        return self.__classes.get(sclass_id)
+
+    def add_students(
+        self, sclass_id: int, students: Iterable[Student]
+    ) -> list[Student]:
+        """Matricula os alunos e retorna os que ainda não estavam na turma."""
+        sclass = self.__classes[sclass_id]
+        added: list[Student] = []
+        for student in students:
+            if self.__by_student.contains(student.id, sclass_id):
+                continue
+
+            sclass.students.append(student)
+            self.__by_student.add(student.id, sclass)
+            added.append(student)
+
+        return added
+
     def get_teacher_sclasses(self, teacher_id: int) -> list[SchoolClass]:
-        return [
-            sclass
-            for sclass in self.__classes.values()
-            if sclass.teacher.id == teacher_id
-        ]
+        return self.__by_teacher.get(teacher_id)
 
     def add_resource(self, sclass_id: int, resource: Resource):
         self.__classes[sclass_id].resources.append(resource)
 
+    def register_class_given(self, sclass_id: int):
+        self.__classes[sclass_id].n_classes_passed += 1
+
     def get_student_sclasses(self, student_id: int) -> list[SchoolClass]:
-        return [
-            sclass
-            for sclass in self.__classes.values()
-            if student_id in [s.id for s in sclass.students]
-        ]
+        return self.__by_student.get(student_id)
+
+    def is_student_in_sclass(self, student_id: int, sclass_id: int) -> bool:
+        return self.__by_student.contains(student_id, sclass_id)
 
 
 class ExamRepository:
+    """
+    Quando `roster` é informado, o repositório opera em modo esparso: o resultado
+    sem nota de cada aluno da turma fica implícito na matrícula e só é criado
+    quando `register_grade` grava uma nota. As consultas devolvem as mesmas
+    linhas do modo completo.
+    """
+
     __exams: dict[int, Exam]
     __id_counter: Iterator[int]
     __exam_results: dict[tuple[int, int], StudentExamResult]
-
-    def __init__(self):
+    __exams_by_sclass: dict[int, list[Exam]]
+    __results_by_exam: dict[int, list[StudentExamResult]]
+    __results_by_student: dict[int, list[StudentExamResult]]
+    __results_by_student_sclass: dict[tuple[int, int], list[StudentExamResult]]
+    __roster: SchoolClassRepository | None
+    __exam_rosters: dict[int, SchoolClass]
+    __exams_by_roster: dict[int, list[Exam]]
+
+    def __init__(self, roster: SchoolClassRepository | None = None):
         self.__exams = {}
         self.__exam_results = {}
-        self.__id_counter = count(1)
+        self.__id_counter = IdSequence(1)
+        self.__exams_by_sclass = {}
+        self.__results_by_exam = {}
+        self.__results_by_student = {}
+        self.__results_by_student_sclass = {}
+        self.__roster = roster
+        self.__exam_rosters = {}
+        self.__exams_by_roster = {}
+
+    def is_sparse(self) -> bool:
+        return self.__roster is not None
+
+    def __add_result(self, result: StudentExamResult):
+        exam_id = result.exam.id
+        student_id = result.student.id
+
+        self.__exam_results.update({(exam_id, student_id): result})
+        self.__results_by_exam.setdefault(exam_id, []).append(result)
+        self.__results_by_student.setdefault(student_id, []).append(result)
+        self.__results_by_student_sclass.setdefault(
+            (student_id, result.exam.sclass.id), []
+        ).append(result)
+
+    def __is_enrolled(self, exam: Exam, student_id: int) -> bool:
+        if self.__roster is None:
+            return False
+
+        return self.__roster.is_student_in_sclass(
+            student_id, self.__exam_rosters[exam.id].id
+        )
+
+    def __result_for(self, exam: Exam, student: Student) -> StudentExamResult:
+        exam_result = self.__exam_results.get((exam.id, student.id))
+        if exam_result:
+            return exam_result
+
+        return StudentExamResult(student=student, exam=exam)
 
     def create_exam(self, sclass: SchoolClass, exam: Exam) -> int:
         exam_id = next(self.__id_counter)
         exam.id = exam_id
         self.__exams.update({exam_id: exam})
+        self.__exams_by_sclass.setdefault(exam.sclass.id, []).append(exam)
+
+        if self.is_sparse():
+            self.__exam_rosters.update({exam_id: sclass})
+            self.__exams_by_roster.setdefault(sclass.id, []).append(exam)
+            return exam_id
 
         for student in sclass.students:
-            self.__exam_results.update(
-                {(exam_id, student.id): StudentExamResult(student=student, exam=exam)}
-            )
+            self.__add_result(StudentExamResult(student=student, exam=exam))
 
         return exam_id
 
@@ -107,124 +251,233 @@ class ExamRepository:
         exam_result = self.__exam_results.get((exam.id, student.id))
 
         if not exam_result:
-            if force:
+            enrolled = self.__is_enrolled(exam, student.id)
+            if enrolled and grade is None:
+                return
+
+            if force or enrolled:
                 exam_result = StudentExamResult(student=student, exam=exam)
-                self.__exam_results.update({(exam.id, student.id): exam_result})
+                self.__add_result(exam_result)
             else:
                 raise ValueError("Aluno não está cadastrado na prova.")
 
         exam_result.grade = grade
 
+    def register_grades(
+        self,
+        exam: Exam,
+        students: Iterable[Student],
+        grade: float | None,
+        force: bool = False,
+    ):
+        for student in students:
+            self.register_grade(exam, student, grade, force)
+
+    def register_grade_sheet(self, exam: Exam, grades: dict[Student, float | None]):
+        for student in grades:
+            key = (exam.id, student.id)
+            if key not in self.__exam_results and not self.__is_enrolled(
+                exam, student.id
+            ):
+                raise ValueError("Aluno não está cadastrado na prova.")
+
+        for student, grade in grades.items():
+            self.register_grade(exam, student, grade)
+
+    def get_exam(self, exam_id: int) -> Exam | None:
+        return self.__exams.get(exam_id)
+
+    def submit_grades(self, exam: Exam):
+        exam.grades_submitted = True
+
     def get_class_exams(self, sclass_id: int) -> list[Exam]:
-        return [exam for exam in self.__exams.values() if exam.sclass.id == sclass_id]
+        return list(self.__exams_by_sclass.get(sclass_id, []))
 
     def get_class_exams_without_grade(self, sclass_id: int) -> list[Exam]:
         return [
             exam
-            for exam in self.__exams.values()
-            if exam.sclass.id == sclass_id and not exam.grades_submitted
+            for exam in self.__exams_by_sclass.get(sclass_id, [])
+            if not exam.grades_submitted
         ]
 
     def get_student_exam_results(self, student_id: int) -> list[StudentExamResult]:
-        return [
-            student_exam
-            for student_exam in self.__exam_results.values()
-            if student_exam.student.id == student_id
-        ]
+        """
+        Resultados na ordem em que foram gravados; no modo esparso, os
+        implícitos (sem nota) vêm depois, na ordem das turmas e das provas.
+        """
+        results = list(self.__results_by_student.get(student_id, []))
+        if self.__roster is None:
+            return results
+
+        # O aluno é procurado na turma no máximo uma vez por consulta
+        student = results[0].student if results else None
+        graded_exam_ids = {result.exam.id for result in results}
+        for sclass in self.__roster.get_student_sclasses(student_id):
+            exams = self.__exams_by_roster.get(sclass.id, [])
+            pending = [exam for exam in exams if exam.id not in graded_exam_ids]
+            if not pending:
+                continue
+
+            if student is None:
+                student = next(s for s in sclass.students if s.id == student_id)
+            results.extend(StudentExamResult(student, exam) for exam in pending)
+
+        return results
 
     def get_student_exam_result_in_class(
         self, student_id: int, sclass_id: int
     ) -> list[StudentExamResult]:
-        return [
-            student_exam
-            for student_exam in self.__exam_results.values()
-            if (
-                student_exam.student.id == student_id
-                and student_exam.exam.sclass.id == sclass_id
+        if self.__roster is None:
+            return list(
+                self.__results_by_student_sclass.get((student_id, sclass_id), [])
             )
-        ]
+
+        results: list[StudentExamResult] = []
+        student: Student | None = None
+        for exam in self.__exams_by_sclass.get(sclass_id, []):
+            exam_result = self.__exam_results.get((exam.id, student_id))
+            if exam_result:
+                student = exam_result.student
+                results.append(exam_result)
+            elif self.__is_enrolled(exam, student_id):
+                if student is None:
+                    roster_students = self.__exam_rosters[exam.id].students
+                    student = next(s for s in roster_students if s.id == student_id)
+                results.append(StudentExamResult(student, exam))
+
+        return results
 
     def get_students_exams(self, exam_id: int) -> list[StudentExamResult]:
-        return [
-            student_exam
-            for student_exam in self.__exam_results.values()
-            if student_exam.exam.id == exam_id
-        ]
+        if self.__roster is None:
+            return list(self.__results_by_exam.get(exam_id, []))
+
+        exam = self.__exams[exam_id]
+        roster = self.__exam_rosters[exam_id]
+        results = [self.__result_for(exam, student) for student in roster.students]
+
+        enrolled_ids = {result.student.id for result in results}
+        results.extend(
+            result
+            for result in self.__results_by_exam.get(exam_id, [])
+            if result.student.id not in enrolled_ids
+        )
+
+        return results
 
 
 class AttendanceRepository:
-    __attendance: list[Attendance]
+    """
+    Presenças guardadas em colunas compactas: para cada par (aluno, turma) há um
+    array com o ordinal das datas, de modo que a contagem é o tamanho do array.
+    Aulas creditadas na matrícula tardia ficam em um contador à parte.
+    """
 
-    def __init__(self):
-        self.__attendance = []
+    __dates: dict[int, dict[int, array]]
+    __credits: dict[int, dict[int, int]]
+    __sclasses: dict[int, SchoolClass]
 
-    def register_attendance(self, student: Student, sclass: SchoolClass) -> Attendance:
-        at = Attendance(student, sclass)
-        self.__attendance.append(at)
+    def __init__(self):
+        self.__dates = {}
+        self.__credits = {}
+        self.__sclasses = {}
+
+    def register_attendance(
+        self,
+        student: Student,
+        sclass: SchoolClass,
+        date: datetime.date | None = None,
+    ) -> Attendance:
+        at = Attendance(student, sclass, date or datetime.date.today())
+
+        student_dates = self.__dates.setdefault(student.id, {})
+        if sclass.id not in student_dates:
+            student_dates[sclass.id] = array("I")
+            self.__sclasses.setdefault(sclass.id, sclass)
+
+        student_dates[sclass.id].append(at.date.toordinal())
         return at
 
+    def credit_attendance(
+        self, students: Iterable[Student], sclass: SchoolClass, n_classes: int
+    ):
+        if n_classes <= 0:
+            return
+
+        self.__sclasses.setdefault(sclass.id, sclass)
+        for student in students:
+            student_credits = self.__credits.setdefault(student.id, {})
+            student_credits[sclass.id] = student_credits.get(sclass.id, 0) + n_classes
+
+    def __count(self, student_id: int, sclass_id: int) -> int:
+        dates = self.__dates.get(student_id, {}).get(sclass_id)
+        credit = self.__credits.get(student_id, {}).get(sclass_id, 0)
+        return (len(dates) if dates is not None else 0) + credit
+
     def get_student_attendance_for_class(
         self, student: Student, sclass: SchoolClass
     ) -> float | None:
-        student_ats = [
-            at
-            for at in self.__attendance
-            if at.student.id == student.id and at.sclass.id == sclass.id
-        ]
-
         if sclass.n_classes_passed == 0:
             return
 
-        return len(student_ats) / sclass.n_classes_passed
+        return self.__count(student.id, sclass.id) / sclass.n_classes_passed
 
     def get_student_attendances(
         self, student: Student
     ) -> list[tuple[SchoolClass, float]]:
-        at_by_class: dict[int, list[Attendance]] = {}
-        sclasses: dict[int, SchoolClass] = {}
-        for at in self.__attendance:
-            if at.student.id != student.id:
-                continue
-
-            if at.sclass.id in at_by_class:
-                at_by_class[at.sclass.id].append(at)
-                sclasses.update({at.sclass.id: at.sclass})
-            else:
-                at_by_class.update({at.sclass.id: [at]})
-
         result: list[tuple[SchoolClass, float]] = []
-        for idx, ats in at_by_class.items():
-            sclass = sclasses.get(idx)
-
-            if not sclass:
-                raise ValueError("Algum deu errado")
+        student_dates = self.__dates.get(student.id, {})
+        student_credits = self.__credits.get(student.id, {})
+        for sclass_id in sorted(student_dates.keys() | student_credits.keys()):
+            sclass = self.__sclasses[sclass_id]
+            if sclass.n_classes_passed == 0:
+                continue
 
-            percentage = len(ats) / sclass.n_classes_passed
+            percentage = self.__count(student.id, sclass_id) / sclass.n_classes_passed
             result.append((sclass, percentage))
 
         return result
 
+    def get_student_attendance_dates(
+        self, student: Student, sclass: SchoolClass
+    ) -> list[datetime.date]:
+        dates = self.__dates.get(student.id, {}).get(sclass.id, [])
+        return [datetime.date.fromordinal(ordinal) for ordinal in dates]
+
 
 class ECARepository:
     __ecas: dict[int, ECA]
     __id_counter: Iterator[int]
+    __by_student: ActivityIndex[ECA]
+    __by_teacher: ActivityIndex[ECA]
 
     def __init__(self):
         self.__ecas = {}
-        self.__id_counter = count(1)
+        self.__id_counter = IdSequence(1)
+        self.__by_student = ActivityIndex()
+        self.__by_teacher = ActivityIndex()
 
     def create_eca(self, eca: ECA) -> int:
         eca_id = next(self.__id_counter)
         eca.id = eca_id
         self.__ecas.update({eca_id: eca})
+
+        self.__by_teacher.add(eca.teacher.id, eca)
+        for student in eca.students:
+            self.__by_student.add(student.id, eca)
+
         return eca_id
 
+    def get_eca(self, eca_id: int) -> ECA | None:
+        return self.__ecas.get(eca_id)
+
+    def add_students(self, eca_id: int, students: Iterable[Student]):
+        eca = self.__ecas[eca_id]
+        for student in students:
+            eca.students.append(student)
+            self.__by_student.add(student.id, eca)
+
     def get_ecas(self, teacher_id: int) -> list[ECA]:
-        return [eca for eca in self.__ecas.values() if eca.teacher.id == teacher_id]
+        return self.__by_teacher.get(teacher_id)
 
     def get_student_ecas(self, student_id: int) -> list[ECA]:
-        return [
-            eca
-            for eca in self.__ecas.values()
-            if student_id in [s.id for s in eca.students]
-        ]
+        return self.__by_student.get(student_id)
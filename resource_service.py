@@ -1,10 +1,92 @@
 import time
 import hashlib
+import json
+import math
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Iterable, Iterator, TypeVar
 from abc import ABC, abstractmethod
 from urllib.parse import urlparse
 
+from exceptions import ChecksumMismatchError
+from network_model import NetworkModel
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_slices(data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start : start + chunk_size]
+
+
+def iter_file(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Lê o arquivo com readinto em um único buffer reaproveitado. Cada pedaço só
+    é válido até o próximo ser pedido.
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        while n := f.readinto(buffer):
+            yield view[:n]
+
+
+def filename_for_url(url: str) -> str:
+    parsed = urlparse(url)
+    name = Path(parsed.path).name
+
+    if name:
+        return name
+
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def unique_filenames(
+    urls: Iterable[str], name_for: Callable[[str], str] = filename_for_url
+) -> dict[str, str]:
+    """
+    Nome do arquivo local de cada URL. URLs diferentes com o mesmo nome
+    recebem um sufixo com o hash da URL, para não gravarem no mesmo arquivo.
+    """
+    names = {url: name_for(url) for url in urls}
+    counts = Counter(names.values())
+    for url, name in names.items():
+        if counts[name] > 1:
+            path = Path(name)
+            digest = hashlib.sha256(url.encode()).hexdigest()[:8]
+            names[url] = f"{path.stem}-{digest}{path.suffix}"
+
+    return names
+
+
+def file_sha256(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    hasher = hashlib.sha256()
+    for chunk in iter_file(path, chunk_size):
+        hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+def write_chunks(chunks: Iterable[bytes], path: Path) -> str:
+    """Grava os pedaços em `path` e retorna o SHA-256 calculado durante a escrita."""
+    hasher = hashlib.sha256()
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
 
 class ResourceService(ABC):
     @abstractmethod
@@ -15,84 +97,826 @@ class ResourceService(ABC):
     def download(self, url: str) -> bytes:
         pass
 
+    def download_stream(
+        self, url: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Baixa o recurso em pedaços de até `chunk_size` bytes. A implementação
+        padrão fatia o resultado de `download`; serviços capazes de transmitir
+        em partes devem sobrescrevê-la.
+        """
+        yield from iter_slices(self.download(url), chunk_size)
 
-class MockResourceService(ResourceService):
-    def __init__(self):
-        self._store: Dict[str, bytes] = {}
+    def get_checksum(self, url: str) -> str | None:
+        """SHA-256 do conteúdo publicado pelo serviço, quando conhecido."""
+        return None
 
-    def upload(self, name: str, data: bytes) -> str:
-        key = hashlib.sha256((name + str(time.time())).encode()).hexdigest()
-        url = f"https://mock.storage/{key}/{name}"
-        self._store[url] = data
+    def find_by_digest(self, digest: str) -> str | None:
+        """URL de um conteúdo já publicado com este SHA-256, se houver."""
+        return None
+
+    def download_to_path(self, url: str, path: Path) -> str:
+        """Grava o recurso em `path` e retorna o SHA-256 do que foi gravado."""
+        return write_chunks(self.download_stream(url), path)
+
+    @property
+    def supports_multipart(self) -> bool:
+        """Se o serviço aceita upload em partes (ver MultipartUploadService)."""
+        return False
+
+
+class MultipartUploadService(ResourceService):
+    """
+    Serviço com upload em partes: o cliente abre um upload, envia as partes
+    (em qualquer ordem e em paralelo) e o conclui com a lista de partes
+    confirmadas.
+    """
+
+    @property
+    def supports_multipart(self) -> bool:
+        return True
+
+    @abstractmethod
+    def create_multipart_upload(self, name: str) -> str:
+        pass
+
+    @abstractmethod
+    def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        """Envia uma parte (numerada a partir de 1) e retorna seu etag."""
+        pass
+
+    @abstractmethod
+    def list_parts(self, upload_id: str) -> dict[int, str]:
+        """
+        Partes já confirmadas de um upload em aberto. Lança LookupError se o
+        upload não existe mais.
+        """
+        pass
+
+    @abstractmethod
+    def complete_multipart_upload(
+        self, upload_id: str, parts: list[tuple[int, str]]
+    ) -> str:
+        pass
+
+    @abstractmethod
+    def abort_multipart_upload(self, upload_id: str):
+        pass
 
-        print("⏳ Conectando ao serviço de armazenamento...")
-        time.sleep(1)
 
-        print("⬆️ Fazendo upload do recurso...")
-        time.sleep(4)
+class MockResourceService(MultipartUploadService):
+    network: NetworkModel
 
-        print("✅ Upload concluído.")
+    def __init__(self, network: NetworkModel | None = None):
+        # Sem modelo explícito: 1 s para conectar e 4 s por transferência,
+        # independente do tamanho
+        self.network = network or NetworkModel(latency=1.0, transfer_overhead=4.0)
+        # Cada conteúdo é guardado uma única vez, pelo SHA-256
+        self._blobs: Dict[str, bytes] = {}
+        self._digests: Dict[str, str] = {}
+        self._urls_by_digest: Dict[str, str] = {}
+        self._uploads: Dict[str, tuple[str, Dict[int, bytes]]] = {}
+        self._uploads_lock = threading.Lock()
+
+    def _publish(self, name: str, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._uploads_lock:
+            url = self._urls_by_digest.get(digest)
+            if url is None:
+                url = f"https://mock.storage/{digest}/{name}"
+                self._blobs[digest] = data
+                self._digests[url] = digest
+                self._urls_by_digest[digest] = url
+
+        return url
+
+    @staticmethod
+    def _progress(message: str):
+        """
+        Só a thread principal, que é a do menu, mostra o andamento. Os envios
+        da UploadQueue, os pré-carregamentos do Prefetcher e as partes
+        enviadas em paralelo rodam em outras threads e não imprimem nada, para
+        não aparecerem no meio do prompt.
+        """
+        if threading.current_thread() is threading.main_thread():
+            print(message)
+
+    def upload(self, name: str, data: bytes) -> str:
+        self._progress("⏳ Conectando ao serviço de armazenamento...")
+        self.network.transfer(
+            f"upload:{name}",
+            len(data),
+            on_connected=lambda: self._progress("⬆️ Fazendo upload do recurso..."),
+        )
+        url = self._publish(name, data)
+
+        self._progress("✅ Upload concluído.")
 
         return url
 
     def download(self, url: str) -> bytes:
-        print("⏳ Conectando ao serviço de armazenamento...")
-        time.sleep(1)
+        digest = self._digests.get(url)
+
+        def connected():
+            if digest is None:
+                raise FileNotFoundError(f"resource not found at {url}")
+
+            self._progress("⬇️ Fazendo download do recurso...")
+
+        self._progress("⏳ Conectando ao serviço de armazenamento...")
+        self.network.transfer(
+            f"download:{filename_for_url(url)}",
+            len(self._blobs[digest]) if digest else 0,
+            on_connected=connected,
+        )
+
+        self._progress("✅ Download concluído.")
 
-        if url not in self._store:
-            raise FileNotFoundError(f"resource not found at {url}")
+        return self._blobs[digest]
 
-        print("⬇️ Fazendo download do recurso...")
-        time.sleep(4)
+    def get_checksum(self, url: str) -> str | None:
+        return self._digests.get(url)
 
-        print("✅ Download concluído.")
+    def find_by_digest(self, digest: str) -> str | None:
+        self.network.request(f"lookup:{digest}")
+        return self._urls_by_digest.get(digest)
 
-        return self._store[url]
+    def _get_parts(self, upload_id: str) -> Dict[int, bytes]:
+        if upload_id not in self._uploads:
+            raise LookupError(f"upload {upload_id} não encontrado")
 
+        return self._uploads[upload_id][1]
 
-class CachedResourceProxy(ResourceService):
-    def __init__(self, upstream: ResourceService):
+    def create_multipart_upload(self, name: str) -> str:
+        self._progress("⏳ Conectando ao serviço de armazenamento...")
+        self.network.request(f"create:{name}")
+
+        upload_id = hashlib.sha256((name + str(time.time())).encode()).hexdigest()
+        with self._uploads_lock:
+            self._uploads[upload_id] = (name, {})
+
+        return upload_id
+
+    def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        with self._uploads_lock:
+            parts = self._get_parts(upload_id)
+            name = self._uploads[upload_id][0]
+
+        # A parte usa a sessão aberta em create_multipart_upload: paga a
+        # conexão e os bytes, mas não o overhead fixo de uma transferência
+        self._progress(f"⬆️ Enviando parte {part_number}...")
+        self.network.transfer(f"part:{name}:{part_number}", len(data), overhead=0.0)
+
+        with self._uploads_lock:
+            parts[part_number] = bytes(data)
+
+        return hashlib.sha256(data).hexdigest()
+
+    def list_parts(self, upload_id: str) -> dict[int, str]:
+        with self._uploads_lock:
+            parts = self._get_parts(upload_id)
+            return {n: hashlib.sha256(data).hexdigest() for n, data in parts.items()}
+
+    def complete_multipart_upload(
+        self, upload_id: str, parts: list[tuple[int, str]]
+    ) -> str:
+        with self._uploads_lock:
+            stored = self._get_parts(upload_id)
+            name = self._uploads[upload_id][0]
+            numbers = [n for n, _ in parts]
+            if numbers != list(range(1, len(parts) + 1)):
+                raise ValueError("As partes devem ser numeradas de 1 a N, sem lacunas.")
+
+            for n, etag in parts:
+                if n not in stored or hashlib.sha256(stored[n]).hexdigest() != etag:
+                    raise ValueError(f"Parte {n} ausente ou com etag divergente.")
+
+            data = b"".join(stored[n] for n in numbers)
+            del self._uploads[upload_id]
+
+        url = self._publish(name, data)
+        self._progress("✅ Upload concluído.")
+
+        return url
+
+    def abort_multipart_upload(self, upload_id: str):
+        with self._uploads_lock:
+            self._uploads.pop(upload_id, None)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    coalesced: int = 0
+    prefetched: int = 0
+    prefetch_hits: int = 0
+
+
+class ResourceCache:
+    """
+    Cache LRU limitado por bytes. Ao inserir um item que estoura o orçamento, os
+    itens usados há mais tempo são descartados. Cada item pode ter um TTL.
+    """
+
+    max_bytes: int
+    default_ttl: float | None
+    stats: CacheStats
+
+    def __init__(
+        self,
+        max_bytes: int,
+        default_ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_expired(self, expires_at: float | None) -> bool:
+        return expires_at is not None and self._clock() >= expires_at
+
+    def _discard(self, url: str):
+        data, _ = self._entries.pop(url)
+        self._size -= len(data)
+
+    def contains(self, url: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return False
+
+            if self._is_expired(entry[1]):
+                self._discard(url)
+                self.stats.expirations += 1
+                return False
+
+            return True
+
+    def get(self, url: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and self._is_expired(entry[1]):
+                self._discard(url)
+                self.stats.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(url)
+            self.stats.hits += 1
+            return entry[0]
+
+    def put(self, url: str, data: bytes, ttl: float | None = None):
+        # Um item maior que o orçamento inteiro não é guardado
+        if len(data) > self.max_bytes:
+            return
+
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+
+        with self._lock:
+            if url in self._entries:
+                self._discard(url)
+
+            self._entries[url] = (data, expires_at)
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.stats.evictions += 1
+
+    def remove(self, url: str):
+        with self._lock:
+            if url in self._entries:
+                self._discard(url)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class DiskResourceCache:
+    """
+    Cache em disco endereçado por conteúdo: cada arquivo é salvo uma única vez
+    com o SHA-256 do conteúdo como nome, e um índice append-only mapeia as URLs
+    para os digests. Sobrevive a reinicializações.
+    """
+
+    INDEX_FILE = "index.tsv"
+
+    folder: Path
+    stats: CacheStats
+
+    def __init__(self, folder: str):
+        self.folder = Path(folder).resolve()
+        (self.folder / "objects").mkdir(parents=True, exist_ok=True)
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._digests: Dict[str, str] = {}
+        self._load_index()
+
+    @property
+    def index_path(self) -> Path:
+        return self.folder / self.INDEX_FILE
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+
+                url, digest = line.rstrip("\n").split("\t")
+                if self._object_path(digest).exists():
+                    self._digests[url] = digest
+
+    def _object_path(self, digest: str) -> Path:
+        return self.folder / "objects" / digest[:2] / digest
+
+    def get_digest(self, url: str) -> str | None:
+        return self._digests.get(url)
+
+    def path_for(self, url: str) -> Path | None:
+        digest = self._digests.get(url)
+        if digest is None:
+            self.stats.misses += 1
+            return None
+
+        path = self._object_path(digest)
+        if not path.exists():
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return path
+
+    def contains(self, url: str) -> bool:
+        digest = self._digests.get(url)
+        return digest is not None and self._object_path(digest).exists()
+
+    def read(self, url: str) -> bytes | None:
+        path = self.path_for(url)
+        if path is None:
+            return None
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:]
+
+    def copy_to(self, url: str, dest: Path) -> str | None:
+        """
+        Copia o arquivo em cache para `dest` sem passar pelo espaço do Python.
+        Retorna o digest do conteúdo copiado, ou None se a URL não está em cache.
+        """
+        path = self.path_for(url)
+        if path is None:
+            return None
+
+        shutil.copyfile(path, dest)
+        return path.name
+
+    def put(self, url: str, data: bytes) -> str:
+        return self.put_stream(url, (data,))
+
+    def put_stream(self, url: str, chunks: Iterable[bytes]) -> str:
+        """
+        Grava os pedaços em um arquivo temporário calculando o digest ao mesmo
+        tempo e só então o move para o nome definitivo.
+        """
+        tmp_path = self.temp_path()
+        try:
+            digest = write_chunks(chunks, tmp_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        self.put_file(url, tmp_path, digest)
+        return digest
+
+    def temp_path(self) -> Path:
+        """Arquivo temporário no mesmo sistema de arquivos dos objetos."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.folder / "objects", suffix=".tmp")
+        os.close(fd)
+        return Path(tmp_name)
+
+    def put_file(self, url: str, tmp_path: Path, digest: str):
+        """Move para o cache um arquivo de `temp_path` cujo digest já é conhecido."""
+        path = self._object_path(digest)
+        with self._lock:
+            if path.exists():
+                tmp_path.unlink()
+            else:
+                path.parent.mkdir(exist_ok=True)
+                os.replace(tmp_path, path)
+
+            if self._digests.get(url) != digest:
+                self._digests[url] = digest
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.write(f"{url}\t{digest}\n")
+
+
+class CachedResourceProxy(MultipartUploadService):
+    """
+    Cache de downloads na frente de outro serviço. Os uploads passam direto,
+    e o upload em partes só é suportado se o serviço de origem o suportar.
+    """
+
+    def __init__(
+        self,
+        upstream: ResourceService,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float | None = None,
+        disk_cache: DiskResourceCache | None = None,
+        max_item_bytes: int = 16 * 1024 * 1024,
+    ):
         self._upstream = upstream
-        self._store: Dict[str, bytes] = {}
+        self._cache = ResourceCache(max_bytes, default_ttl=ttl)
+        self._disk_cache = disk_cache
+        self.max_item_bytes = max_item_bytes
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self._prefetched: set[str] = set()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
 
     def upload(self, name: str, data: bytes) -> str:
         return self._upstream.upload(name, data)
 
+    @property
+    def supports_multipart(self) -> bool:
+        return self._upstream.supports_multipart
+
+    def create_multipart_upload(self, name: str) -> str:
+        return self._upstream.create_multipart_upload(name)
+
+    def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        return self._upstream.upload_part(upload_id, part_number, data)
+
+    def list_parts(self, upload_id: str) -> dict[int, str]:
+        return self._upstream.list_parts(upload_id)
+
+    def complete_multipart_upload(
+        self, upload_id: str, parts: list[tuple[int, str]]
+    ) -> str:
+        return self._upstream.complete_multipart_upload(upload_id, parts)
+
+    def abort_multipart_upload(self, upload_id: str):
+        self._upstream.abort_multipart_upload(upload_id)
+
+    def get_checksum(self, url: str) -> str | None:
+        return self._upstream.get_checksum(url)
+
+    def find_by_digest(self, digest: str) -> str | None:
+        return self._upstream.find_by_digest(digest)
+
     def is_cached(self, url: str) -> bool:
-        return url in self._store
+        if self._cache.contains(url):
+            return True
 
-    def download(self, url: str) -> bytes:
+        return self._disk_cache is not None and self._disk_cache.contains(url)
+
+    def _single_flight(
+        self, key: str, cached: Callable[[], T | None], load: Callable[[], T]
+    ) -> T:
+        """
+        Agrupa pedidos concorrentes pela mesma chave: só a primeira thread
+        executa `load`, as demais esperam o mesmo resultado. Erros são
+        repassados a todas e não ficam em cache.
+        """
+        leader = False
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._cache.stats.coalesced += 1
+            else:
+                # Outro download pode ter terminado depois da consulta ao cache
+                value = cached()
+                if value is not None:
+                    return value
+
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._in_flight[key] = future
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = load()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+
+    def _fetch(self, url: str) -> bytes:
+        def cached() -> bytes | None:
+            return self._cache.get(url) if self._cache.contains(url) else None
+
+        def load() -> bytes:
+            data = self._upstream.download(url)
+            self._cache.put(url, data)
+            if self._disk_cache is not None:
+                self._disk_cache.put(url, data)
+            return data
+
+        return self._single_flight(url, cached, load)
+
+    def _fill_disk_cache(self, disk_cache: DiskResourceCache, url: str) -> str:
+        """Transmite o recurso do upstream direto para o cache em disco."""
+
+        def cached() -> str | None:
+            return disk_cache.get_digest(url) if disk_cache.contains(url) else None
+
+        def load() -> str:
+            return disk_cache.put_stream(url, self._stream_upstream(url))
+
+        return self._single_flight(f"disk:{url}", cached, load)
+
+    def _stream_upstream(
+        self, url: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Repassa os pedaços do upstream guardando uma cópia no cache em memória
+        apenas se o recurso inteiro couber em `max_item_bytes`.
+        """
+        buffer: bytearray | None = bytearray()
+        for chunk in self._upstream.download_stream(url, chunk_size):
+            if buffer is not None:
+                if len(buffer) + len(chunk) > self.max_item_bytes:
+                    buffer = None
+                else:
+                    buffer += chunk
+            yield chunk
+
+        if buffer is not None:
+            self._cache.put(url, bytes(buffer))
+
+    def _on_hit(self, url: str):
+        if url in self._prefetched:
+            self._cache.stats.prefetch_hits += 1
+
+    def _on_miss(self, url: str):
+        # O item pré-carregado saiu do cache; o que vier agora não conta mais
+        self._prefetched.discard(url)
+
+    def prefetch(self, url: str) -> bool:
+        """
+        Traz o recurso para o cache sem entregá-lo a ninguém. Retorna False se
+        ele já estava em cache.
+        """
         if self.is_cached(url):
-            return self._store[url]
+            return False
+
+        if self._disk_cache is not None:
+            self._fill_disk_cache(self._disk_cache, url)
+        else:
+            self._fetch(url)
+
+        with self._in_flight_lock:
+            self._prefetched.add(url)
+            self._cache.stats.prefetched += 1
+
+        return True
+
+    def download(self, url: str) -> bytes:
+        data = self._cache.get(url)
+        if data is not None:
+            self._on_hit(url)
+            return data
+
+        if self._disk_cache is not None:
+            data = self._disk_cache.read(url)
+            if data is not None:
+                self._on_hit(url)
+                self._cache.put(url, data)
+                return data
+
+        self._on_miss(url)
+        return self._fetch(url)
+
+    def download_stream(
+        self, url: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        data = self._cache.get(url)
+        if data is not None:
+            self._on_hit(url)
+            yield from iter_slices(data, chunk_size)
+            return
 
-        data = self._upstream.download(url)
-        self._store[url] = data
+        if self._disk_cache is None:
+            # Sem cache em disco, o pedido se junta a um download ou
+            # pré-carregamento da mesma URL que já esteja em andamento
+            self._on_miss(url)
+            yield from iter_slices(self._fetch(url), chunk_size)
+            return
 
-        return data
+        path = self._disk_cache.path_for(url)
+        if path is None:
+            self._on_miss(url)
+            self._fill_disk_cache(self._disk_cache, url)
+            path = self._disk_cache.path_for(url)
+        else:
+            self._on_hit(url)
+
+        # iter_file reaproveita o buffer; quem consome o stream pode guardar
+        # os pedaços, então cada um sai como uma cópia
+        for chunk in iter_file(path, chunk_size):
+            yield bytes(chunk)
+
+    def download_to_path(self, url: str, path: Path) -> str:
+        data = self._cache.get(url)
+        if data is not None:
+            self._on_hit(url)
+            return write_chunks(iter_slices(data), path)
+
+        if self._disk_cache is None:
+            self._on_miss(url)
+            return write_chunks(iter_slices(self._fetch(url)), path)
+
+        digest = self._disk_cache.copy_to(url, path)
+        if digest is None:
+            self._on_miss(url)
+            self._fill_disk_cache(self._disk_cache, url)
+            digest = self._disk_cache.copy_to(url, path)
+        else:
+            self._on_hit(url)
+
+        return digest
 
     def clear_cache(self):
-        self._store.clear()
+        """Limpa apenas o cache em memória; o cache em disco é persistente."""
+        self._cache.clear()
+
+
+class Prefetcher:
+    """
+    Aquece o cache do proxy em segundo plano, com no máximo `max_concurrency`
+    downloads simultâneos. Pedidos ainda na fila podem ser cancelados; um
+    download já iniciado vai até o fim, pois pode estar servindo também a um
+    usuário que pediu o mesmo recurso. Falhas são ignoradas: o próximo
+    download do recurso tenta de novo.
+    """
+
+    def __init__(self, proxy: CachedResourceProxy, max_concurrency: int = 2):
+        self._proxy = proxy
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="prefetch"
+        )
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def prefetch(self, url: str) -> Future | None:
+        with self._lock:
+            if self._closed or url in self._pending or self._proxy.is_cached(url):
+                return None
+
+            future = self._pool.submit(self._warm, url)
+            self._pending[url] = future
+
+        future.add_done_callback(lambda _: self._forget(url))
+        return future
+
+    def _warm(self, url: str) -> bool:
+        try:
+            return self._proxy.prefetch(url)
+        except Exception:
+            return False
+
+    def _forget(self, url: str):
+        with self._lock:
+            self._pending.pop(url, None)
+
+    def cancel(self, url: str) -> bool:
+        with self._lock:
+            future = self._pending.get(url)
+
+        return future is not None and future.cancel()
+
+    def cancel_all(self):
+        with self._lock:
+            futures = list(self._pending.values())
+
+        for future in futures:
+            future.cancel()
+
+    def shutdown(self, wait: bool = True):
+        """Cancela o que ainda está na fila e encerra as threads."""
+        with self._lock:
+            self._closed = True
+
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: Path | None = None
+    error: Exception | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class UploadManifest:
+    """Estado local de um upload em partes, usado para retomá-lo."""
+
+    upload_id: str
+    size: int
+    mtime_ns: int
+    part_size: int
+    parts: dict[int, str] = field(default_factory=dict)
+
+    def save(self, path: Path):
+        record = {
+            "upload_id": self.upload_id,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "part_size": self.part_size,
+            "parts": sorted(self.parts.items()),
+        }
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(record), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "UploadManifest | None":
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+        return cls(
+            upload_id=record["upload_id"],
+            size=record["size"],
+            mtime_ns=record["mtime_ns"],
+            part_size=record["part_size"],
+            parts={n: etag for n, etag in record["parts"]},
+        )
 
 
 class ResourceToFileAdapter:
     download_folder: Path
+    manifest_folder: Path
+    part_size: int
+    max_workers: int
 
-    def __init__(self, service: ResourceService, download_folder: str = "./resources"):
+    def __init__(
+        self,
+        service: ResourceService,
+        download_folder: str = "./resources",
+        manifest_folder: str = "./.uploads",
+        part_size: int = 8 * 1024 * 1024,
+        max_workers: int = 4,
+    ):
         self._service = service
         self.set_download_folder(download_folder)
+        self.manifest_folder = Path(manifest_folder).resolve()
+        self.manifest_folder.mkdir(parents=True, exist_ok=True)
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self._urls_by_digest: Dict[str, str] = {}
 
     def set_download_folder(self, folder: str):
         self.download_folder = Path(folder).resolve()
         self.download_folder.mkdir(parents=True, exist_ok=True)
 
     def _filename_for_url(self, url: str) -> str:
-        parsed = urlparse(url)
-        name = Path(parsed.path).name
-
-        if name:
-            return name
-
-        return hashlib.sha256(url.encode()).hexdigest()
+        return filename_for_url(url)
 
     def upload_from_path(self, str_path: str) -> str:
         path = Path(str_path).resolve()
@@ -103,14 +927,170 @@ class ResourceToFileAdapter:
         if path.is_dir():
             raise ValueError("O path representa um diretório.")
 
-        data = path.read_bytes()
-        return self._service.upload(path.name, data)
+        # Conteúdo já publicado (por esta sessão ou por outra) não é reenviado
+        digest = file_sha256(path)
+        url = self._urls_by_digest.get(digest) or self._service.find_by_digest(digest)
+        if url is None:
+            if (
+                path.stat().st_size <= self.part_size
+                or not self._service.supports_multipart
+            ):
+                url = self._service.upload(path.name, path.read_bytes())
+            else:
+                url = self._upload_multipart(path)
+
+        self._urls_by_digest[digest] = url
+        return url
+
+    def _manifest_path(self, path: Path) -> Path:
+        key = hashlib.sha256(str(path).encode()).hexdigest()
+        return self.manifest_folder / f"{key}.json"
+
+    def _resume_manifest(self, manifest_path: Path, stat: os.stat_result):
+        """
+        Retoma o upload anterior do mesmo arquivo se ele não mudou desde então,
+        mantendo só as partes que o serviço ainda confirma ter recebido.
+        """
+        manifest = UploadManifest.load(manifest_path)
+        if manifest is None:
+            return None
+
+        if (manifest.size, manifest.mtime_ns, manifest.part_size) != (
+            stat.st_size,
+            stat.st_mtime_ns,
+            self.part_size,
+        ):
+            return None
+
+        try:
+            acknowledged = self._service.list_parts(manifest.upload_id)
+        except LookupError:
+            return None
+
+        manifest.parts = {
+            n: etag for n, etag in manifest.parts.items() if acknowledged.get(n) == etag
+        }
+        return manifest
+
+    def _upload_multipart(self, path: Path) -> str:
+        """
+        Envia o arquivo em partes de `part_size` bytes lidas via mmap, com até
+        `max_workers` partes em paralelo. Cada parte confirmada é gravada no
+        manifesto, então uma nova chamada após uma falha só envia o que falta.
+        """
+        stat = path.stat()
+        manifest_path = self._manifest_path(path)
+        manifest = self._resume_manifest(manifest_path, stat)
+        if manifest is None:
+            manifest = UploadManifest(
+                upload_id=self._service.create_multipart_upload(path.name),
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                part_size=self.part_size,
+            )
+            manifest.save(manifest_path)
+
+        n_parts = math.ceil(stat.st_size / self.part_size)
+        pending = [n for n in range(1, n_parts + 1) if n not in manifest.parts]
+        manifest_lock = threading.Lock()
 
-    def download_to_folder(self, url: str) -> Path:
-        data = self._service.download(url)
+        with open(path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
 
-        filename = self._filename_for_url(url)
+            def send(part_number: int):
+                start = (part_number - 1) * self.part_size
+                data = mm[start : start + self.part_size]
+                etag = self._service.upload_part(manifest.upload_id, part_number, data)
+                with manifest_lock:
+                    manifest.parts[part_number] = etag
+                    manifest.save(manifest_path)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(send, n) for n in pending]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        url = self._service.complete_multipart_upload(
+            manifest.upload_id, sorted(manifest.parts.items())
+        )
+        manifest_path.unlink(missing_ok=True)
+
+        return url
+
+    def download_to_folder(
+        self, url: str, checksum: str | None = None, filename: str | None = None
+    ) -> Path:
+        """
+        Baixa o recurso em partes para um arquivo temporário na própria pasta e
+        só o renomeia para o nome final (`filename` ou o nome na URL) depois de
+        conferir o SHA-256, então um download interrompido ou corrompido nunca
+        sobrescreve o arquivo anterior.
+        """
+        filename = filename or self._filename_for_url(url)
         path = self.download_folder / filename
-        path.write_bytes(data)
+
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.download_folder, prefix=f".{filename}.", suffix=".part"
+        )
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            digest = self._service.download_to_path(url, tmp_path)
+            expected = checksum or self._service.get_checksum(url)
+            if expected is not None and digest != expected:
+                raise ChecksumMismatchError(url, expected, digest)
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
         return path
+
+    def _timed_download(self, url: str, filename: str) -> DownloadResult:
+        start = time.perf_counter()
+        try:
+            path = self.download_to_folder(url, filename=filename)
+        except Exception as e:
+            return DownloadResult(url, error=e, seconds=time.perf_counter() - start)
+
+        return DownloadResult(url, path, seconds=time.perf_counter() - start)
+
+    def download_many(
+        self,
+        urls: Iterable[str],
+        max_workers: int | None = None,
+        progress: Callable[[DownloadResult, int, int], None] | None = None,
+    ) -> list[DownloadResult]:
+        """
+        Baixa várias URLs em paralelo, com no máximo `max_workers` downloads
+        simultâneos. Uma falha não interrompe os demais: cada item tem seu
+        próprio resultado. `progress(resultado, concluídos, total)` é chamado na
+        thread de quem chamou, à medida que os downloads terminam. Os
+        resultados voltam na ordem das URLs. URLs com o mesmo nome de arquivo
+        são gravadas em arquivos distintos (ver `unique_filenames`).
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        results: dict[str, DownloadResult] = {}
+        if not unique_urls:
+            return []
+
+        filenames = unique_filenames(unique_urls, self._filename_for_url)
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as pool:
+            futures = [
+                pool.submit(self._timed_download, url, filenames[url])
+                for url in unique_urls
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results[result.url] = result
+                if progress:
+                    progress(result, done, len(unique_urls))
+
+        return [results[url] for url in unique_urls]
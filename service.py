@@ -1,6 +1,40 @@
+import atexit
 import datetime
-
+import queue
+import threading
+from typing import Callable
+
+from config import (
+    DATABASE_PATH,
+    JOURNAL_FOLDER,
+    PREFETCH_MAX_CONCURRENCY,
+    REPOSITORY_BACKEND,
+    RESOURCE_CACHE_MAX_BYTES,
+    RESOURCE_CACHE_MAX_ITEM_BYTES,
+    RESOURCE_CACHE_TTL,
+    RESOURCE_DISK_CACHE_FOLDER,
+    SNAPSHOT_INTERVAL,
+    UPLOAD_MANIFEST_FOLDER,
+    UPLOAD_MAX_WORKERS,
+    UPLOAD_PART_SIZE,
+    UPLOAD_QUEUE_WORKERS,
+)
 from exceptions import InvalidGradeException
+from persistence import (
+    SchoolStore,
+    enroll_students,
+    sclass_to_record,
+    user_to_record,
+)
+from queries import (
+    ClassAttendance,
+    ClassExams,
+    ClassGradebook,
+    ClassSummary,
+    ExamEntry,
+    GradebookRow,
+    StudentDashboard,
+)
 from repository import (
     AttendanceRepository,
     ECARepository,
@@ -10,9 +44,20 @@ from repository import (
 )
 from resource_service import (
     CachedResourceProxy,
+    DiskResourceCache,
+    DownloadResult,
     MockResourceService,
+    Prefetcher,
     ResourceToFileAdapter,
 )
+from sqlite_repository import (
+    SQLiteAttendanceRepository,
+    SQLiteDatabase,
+    SQLiteECARepository,
+    SQLiteExamRepository,
+    SQLiteSchoolClassRepository,
+    SQLiteUserRepository,
+)
 from system import (
     ECA,
     Employee,
@@ -20,125 +65,386 @@ from system import (
     Guardian,
     PaymentMethod,
     Resource,
+    ResourceStatus,
     SchoolClass,
     Student,
     User,
 )
+from upload_queue import UploadJob, UploadQueue, UploadStatus
 from utils import generate_random_hash, select_item
 
 
 class School:
     __instance = None
     _initialized = False
+    store: SchoolStore | None = None
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if School.__instance is None:
             School.__instance = super().__new__(cls)
             School.__instance._initialized = False
         return School.__instance
 
-    def __init__(self):
+    def __init__(self, backend: str = REPOSITORY_BACKEND, seed: bool = True):
+        """
+        Com `seed=False` um banco vazio não recebe os dados de demonstração
+        (usado pelo importador, para não criar as contas de exemplo).
+        """
         if not self._initialized:
-            self.sclass_repo = SchoolClassRepository()
-            self.user_repo = UserRepository()
-            self.attendance_repo = AttendanceRepository()
-            self.exam_repo = ExamRepository()
-            self.eca_repo = ECARepository()
+            match backend:
+                case "memory":
+                    self.create_memory_repositories()
+                case "sqlite":
+                    self.create_sqlite_repositories(DATABASE_PATH)
+                case "journal":
+                    self.create_memory_repositories()
+                    self.store = SchoolStore(JOURNAL_FOLDER, SNAPSHOT_INTERVAL)
+                    self.store.load(self)
+                    atexit.register(self.store.close, self)
+                case _:
+                    raise ValueError(f"Backend desconhecido: {backend}")
+
+            self.resource_proxy = CachedResourceProxy(
+                upstream=MockResourceService(),
+                max_bytes=RESOURCE_CACHE_MAX_BYTES,
+                ttl=RESOURCE_CACHE_TTL,
+                disk_cache=DiskResourceCache(RESOURCE_DISK_CACHE_FOLDER),
+                max_item_bytes=RESOURCE_CACHE_MAX_ITEM_BYTES,
+            )
             self.resource_adapter = ResourceToFileAdapter(
-                service=CachedResourceProxy(upstream=MockResourceService())
+                service=self.resource_proxy,
+                manifest_folder=UPLOAD_MANIFEST_FOLDER,
+                part_size=UPLOAD_PART_SIZE,
+                max_workers=UPLOAD_MAX_WORKERS,
+            )
+            self.upload_queue = UploadQueue(self.resource_adapter, UPLOAD_QUEUE_WORKERS)
+            # atexit roda em ordem inversa: os envios terminam antes de aplicar
+            # as conclusões que ainda estiverem pendentes
+            atexit.register(self.process_completions)
+            atexit.register(self.upload_queue.shutdown)
+            self.prefetcher = Prefetcher(self.resource_proxy, PREFETCH_MAX_CONCURRENCY)
+            atexit.register(self.prefetcher.shutdown)
+            self._pending_resources: dict[int, list[Resource]] = {}
+            self._pending_lock = threading.Lock()
+            self._completions: queue.SimpleQueue[Callable[[], None]] = (
+                queue.SimpleQueue()
             )
 
-            self.populate()
+            if seed and self.user_repo.is_empty():
+                self.populate()
+                self.checkpoint()
 
             self._initialized = True
 
+    def create_memory_repositories(self):
+        self.sclass_repo = SchoolClassRepository()
+        self.user_repo = UserRepository()
+        self.attendance_repo = AttendanceRepository()
+        self.exam_repo = ExamRepository(roster=self.sclass_repo)
+        self.eca_repo = ECARepository()
+
+    def create_sqlite_repositories(self, path: str):
+        db = SQLiteDatabase(path)
+        self.user_repo = SQLiteUserRepository(db)
+        self.sclass_repo = SQLiteSchoolClassRepository(db, self.user_repo)
+        self.attendance_repo = SQLiteAttendanceRepository(db, self.sclass_repo)
+        self.exam_repo = SQLiteExamRepository(db, self.user_repo, self.sclass_repo)
+        self.eca_repo = SQLiteECARepository(db, self.user_repo)
+
+    def record(self, op: str, **data):
+        if self.store is None:
+            return
+
+        self.store.append(op, data)
+        if self.store.should_checkpoint():
+            self.store.checkpoint(self)
+
+    def checkpoint(self):
+        if self.store is not None:
+            self.store.checkpoint(self)
+
     def register_user(self, user: User):
         idx = self.user_repo.add_user(user)
+        self.record("register_user", **user_to_record(user))
         print(f"{user.get_type()} cadastrado (ID {idx})")
 
+    def register_users(self, users: list[User]) -> list[int]:
+        ids = self.user_repo.add_users(users)
+        self.record("register_users", users=[user_to_record(u) for u in users])
+        return ids
+
     def login(self, nome: str, senha: str) -> User:
         return self.user_repo.validate_user(nome, senha)
 
+    def registrar_aula(self, sclass: SchoolClass):
+        self.sclass_repo.register_class_given(sclass.id)
+        self.record("registrar_aula", sclass_id=sclass.id)
+
     def registrar_presenca(self, student: Student, sclass: SchoolClass):
         at = self.attendance_repo.register_attendance(student, sclass)
+        self.record(
+            "registrar_presenca",
+            student_id=student.id,
+            sclass_id=sclass.id,
+            date=at.date.isoformat(),
+        )
         print(f"Presença registrada para {student.name} em {at.date}")
 
     def lancar_nota(self, exam: Exam, student: Student, grade: float):
         self.exam_repo.register_grade(exam, student, grade)
+        self.record(
+            "lancar_nota", exam_id=exam.id, student_id=student.id, grade=grade
+        )
         print(
             f"Nota {grade} lançada para {student.name} na prova {exam.name} da turma {exam.sclass.name}"
         )
 
+    def lancar_notas(self, exam: Exam, grades: dict[Student, float | None]):
+        self.exam_repo.register_grade_sheet(exam, grades)
+        self.record(
+            "lancar_notas",
+            exam_id=exam.id,
+            grades=[[student.id, grade] for student, grade in grades.items()],
+        )
+
     def distribuir_material(self, resource: Resource, sclass: SchoolClass):
         self.sclass_repo.add_resource(sclass.id, resource)
+        self.record(
+            "distribuir_material",
+            sclass_id=sclass.id,
+            name=resource.name,
+            url=resource.url,
+        )
         print(f"Material '{resource.name}' disponível para turma {sclass.name}")
 
+        # Os alunos da turma vão baixar o material em breve
+        if sclass.students:
+            self.prefetcher.prefetch(resource.url)
+
+    def publicar_material(
+        self, name: str, str_path: str, sclasses: list[SchoolClass]
+    ) -> UploadJob:
+        """
+        Enfileira o upload e retorna na hora. Até o envio terminar, as turmas
+        mostram o material como "processando"; depois ele é distribuído (e
+        registrado no journal) como em `distribuir_material`. A distribuição
+        não roda na thread do envio: ela espera o menu chamar
+        `process_completions`, para não alterar os repositórios (nem gravar
+        o snapshot) ao mesmo tempo que a thread do menu.
+        """
+        placeholders = [
+            (sclass, Resource(name, "", ResourceStatus.PROCESSING)) for sclass in sclasses
+        ]
+
+        def complete(job: UploadJob):
+            with self._pending_lock:
+                for sclass, placeholder in placeholders:
+                    self._pending_resources[sclass.id].remove(placeholder)
+
+            if job.status is UploadStatus.FAILED:
+                print(f"❌ Falha no envio do material '{name}': {job.error}")
+                return
+
+            for sclass, _ in placeholders:
+                self.distribuir_material(Resource(name, job.url), sclass)
+
+        def on_done(job: UploadJob):
+            self._completions.put(lambda: complete(job))
+
+        with self._pending_lock:
+            job = self.upload_queue.submit(str_path, on_done)
+            for sclass, placeholder in placeholders:
+                self._pending_resources.setdefault(sclass.id, []).append(placeholder)
+
+        return job
+
+    def process_completions(self):
+        """Aplica, na thread de quem chama, os envios concluídos até agora."""
+        while True:
+            try:
+                completion = self._completions.get_nowait()
+            except queue.Empty:
+                return
+
+            completion()
+
+    def get_sclass_resources(self, sclass: SchoolClass) -> list[Resource]:
+        """Materiais da turma, incluindo os que ainda estão sendo enviados."""
+        with self._pending_lock:
+            pending = list(self._pending_resources.get(sclass.id, []))
+
+        return sclass.resources + pending
+
+    def consultar_envios(self):
+        jobs = self.upload_queue.get_jobs()
+
+        print("⬆️ Envios de materiais:")
+        if not jobs:
+            print("    📭 Nenhum envio realizado.")
+            return
+
+        for job in jobs:
+            detail = ""
+            if job.status is UploadStatus.DONE:
+                detail = f" → {job.url}"
+            elif job.status is UploadStatus.FAILED:
+                detail = f" → {job.error}"
+            print(f"    #{job.id} {job.path.name} ({job.status}){detail}")
+
     def agendar_prova(self, sclass: SchoolClass, exam: Exam):
         self.exam_repo.create_exam(sclass, exam)
+        self.record(
+            "agendar_prova",
+            sclass_id=sclass.id,
+            exam_sclass_id=exam.sclass.id,
+            name=exam.name,
+            date=exam.date.isoformat(),
+        )
         print(
             f"Prova '{exam.name}' agendada para a turma {sclass.name} na data {exam.date}"
         )
 
     def criar_atividade_extracurricular(self, eca: ECA):
         self.eca_repo.create_eca(eca)
+        self.record(
+            "criar_atividade_extracurricular",
+            name=eca.name,
+            teacher_id=eca.teacher.id,
+            schedule=eca.schedule.isoformat(),
+            student_ids=[s.id for s in eca.students],
+        )
         print(
             f"Atividade Extracurricular '{eca.name}' criada pelo funcionário {eca.teacher.name}"
         )
 
+    def get_student_classes(self, student: Student) -> list[SchoolClass]:
+        return self.sclass_repo.get_student_sclasses(student.id)
+
+    def get_student_ecas(self, student: Student) -> list[ECA]:
+        return self.eca_repo.get_student_ecas(student.id)
+
+    def _get_exam_entries(
+        self, student: Student, sclass: SchoolClass
+    ) -> list[ExamEntry]:
+        exam_results = self.exam_repo.get_student_exam_result_in_class(
+            student.id, sclass.id
+        )
+        return [
+            ExamEntry.from_grade(result.exam, result.grade)
+            for result in sorted(exam_results, key=lambda r: r.exam.date)
+        ]
+
+    def get_student_exams(self, student: Student) -> list[ClassExams]:
+        return [
+            ClassExams(sclass, self._get_exam_entries(student, sclass))
+            for sclass in self.get_student_classes(student)
+        ]
+
+    def get_student_attendance(self, student: Student) -> list[ClassAttendance]:
+        return [
+            ClassAttendance(
+                sclass,
+                self.attendance_repo.get_student_attendance_for_class(student, sclass),
+            )
+            for sclass in self.get_student_classes(student)
+        ]
+
+    def get_student_dashboard(self, student: Student) -> StudentDashboard:
+        """
+        Turmas do aluno com materiais, provas e presença, e as atividades.
+        Para mostrar só uma parte, use a consulta específica (get_student_*).
+        """
+        classes = [
+            ClassSummary(
+                sclass=sclass,
+                resources=self.get_sclass_resources(sclass),
+                exams=self._get_exam_entries(student, sclass),
+                attendance=self.attendance_repo.get_student_attendance_for_class(
+                    student, sclass
+                ),
+            )
+            for sclass in self.get_student_classes(student)
+        ]
+
+        return StudentDashboard(
+            student=student,
+            classes=classes,
+            ecas=self.get_student_ecas(student),
+        )
+
+    def get_class_exams(self, sclass: SchoolClass) -> list[Exam]:
+        return self.exam_repo.get_class_exams(sclass.id)
+
+    def get_class_gradebook(self, sclass: SchoolClass) -> ClassGradebook:
+        """Notas de cada aluno da turma em todas as provas, ordenadas por data."""
+        exams = sorted(self.exam_repo.get_class_exams(sclass.id), key=lambda e: e.date)
+        grades_by_exam = [
+            {
+                result.student.id: result.grade
+                for result in self.exam_repo.get_students_exams(exam.id)
+            }
+            for exam in exams
+        ]
+
+        rows = [
+            GradebookRow(
+                student=student,
+                grades=[grades.get(student.id) for grades in grades_by_exam],
+                attendance=self.attendance_repo.get_student_attendance_for_class(
+                    student, sclass
+                ),
+            )
+            for student in sclass.students
+        ]
+
+        return ClassGradebook(sclass=sclass, exams=exams, rows=rows)
+
     def consultar_dados_aluno(self, student: Student):
-        student_sclasses = self.sclass_repo.get_student_sclasses(student.id)
+        dashboard = self.get_student_dashboard(student)
         print(f"📋 Dados do(a) aluno(a) {student.name}:")
-        if not student_sclasses:
+        if not dashboard.classes:
             print("\n📭 O(A) aluno(a) não foi cadastrado(a) em uma turma.")
 
-        for sclass in student_sclasses:
+        for summary in dashboard.classes:
+            sclass = summary.sclass
             print(f"\n🏫 Turma {sclass.name} ({sclass.get_schedule()})")
 
             print("    📚 Materiais:")
-            if sclass.resources:
-                for resource in sclass.resources:
-                    print(f"        {resource.name} ({resource.url})")
+            if summary.resources:
+                for resource in summary.resources:
+                    if resource.status is ResourceStatus.PROCESSING:
+                        print(f"        {resource.name} (⏳ {resource.status})")
+                    else:
+                        print(f"        {resource.name} ({resource.url})")
             else:
                 print("        📭 Nenhum material disponível.")
 
-            exam_results = self.exam_repo.get_student_exam_result_in_class(
-                student.id, sclass.id
-            )
             print("    📈 Provas e Notas:")
-            if exam_results:
-                sorted_result = sorted(exam_results, key=lambda r: r.exam.date)
-                for result in sorted_result:
-                    status = ""
-                    if result.exam.date > datetime.date.today():
-                        status = "prova agendada"
-                    elif result.grade is None:
-                        status = "nota não registrada"
-                    elif result.grade:
-                        status = f"nota {result.grade}"
-
-                    print(f"        [{result.exam.date}] {result.exam.name} ({status})")
+            if summary.exams:
+                for entry in summary.exams:
+                    print(
+                        f"        [{entry.exam.date}] {entry.exam.name} ({entry.describe()})"
+                    )
             else:
                 print("        📭 Nenhum prova ou nota disponível.")
 
-            ats = self.attendance_repo.get_student_attendance_for_class(student, sclass)
             print("    📅 Presenças:")
-            if ats is not None:
+            if summary.attendance is not None:
                 print(
-                    f"        ✅ Presença (%): {(ats * 100):.2f} (registradas {sclass.n_classes_passed} aulas)"
+                    f"        ✅ Presença (%): {(summary.attendance * 100):.2f} (registradas {sclass.n_classes_passed} aulas)"
                 )
             else:
                 print("        📭 Nenhuma presença registrada para essa turma.")
 
-        student_ecas = self.eca_repo.get_student_ecas(student.id)
         print("\n🎯 Atividades extracurriculares:")
-        if student_ecas:
-            for eca in student_ecas:
+        if dashboard.ecas:
+            for eca in dashboard.ecas:
                 print(f"   {eca.name} ({eca.get_schedule()})")
         else:
             print("    📭 O aluno não participa de nenhuma atividade extracurricular.")
 
     def consultar_materiais(self, student: Student):
-        student_sclasses = self.sclass_repo.get_student_sclasses(student.id)
+        student_sclasses = self.get_student_classes(student)
 
         print("📚 Materiais:")
         if not student_sclasses:
@@ -147,8 +453,10 @@ class School:
 
         items: list[tuple[SchoolClass, Resource]] = []
         for sclass in student_sclasses:
-            if sclass.resources:
-                for resource in sclass.resources:
+            for resource in self.get_sclass_resources(sclass):
+                if resource.status is ResourceStatus.PROCESSING:
+                    print(f"    ⏳ {sclass.name} - {resource.name} ({resource.status})")
+                else:
                     items.append((sclass, resource))
 
         if not items:
@@ -171,54 +479,68 @@ class School:
         except Exception as e:
             print(f"❌ Erro ao baixar '{selected_resource.name}': {e}")
 
-    def consultar_notas_e_provas(self, student: Student):
+    def baixar_todos_materiais(self, student: Student):
         student_sclasses = self.sclass_repo.get_student_sclasses(student.id)
 
+        print("📚 Baixando todos os materiais:")
+        names: dict[str, str] = {}
+        for sclass in student_sclasses:
+            for resource in sclass.resources:
+                names.setdefault(resource.url, f"{sclass.name} - {resource.name}")
+
+        if not names:
+            print("    📭 Nenhum material disponível.")
+            return
+
+        def show_progress(result: DownloadResult, done: int, total: int):
+            if result.ok:
+                print(f"    ✅ [{done}/{total}] {names[result.url]} salvo em: {result.path}")
+            else:
+                print(f"    ❌ [{done}/{total}] {names[result.url]}: {result.error}")
+
+        results = self.resource_adapter.download_many(names, progress=show_progress)
+        n_ok = sum(result.ok for result in results)
+        print(f"\n{n_ok} de {len(results)} materiais baixados.")
+
+    def consultar_notas_e_provas(self, student: Student):
+        class_exams = self.get_student_exams(student)
+
         print("📈 Provas e Notas:")
-        if not student_sclasses:
+        if not class_exams:
             print("    📭 O(A) não foi cadastrado(a) em uma turma.")
 
-        for sclass in student_sclasses:
+        for item in class_exams:
+            sclass = item.sclass
             print(f"🏫 Turma {sclass.name} ({sclass.get_schedule()})")
 
-            exam_results = self.exam_repo.get_student_exam_result_in_class(
-                student.id, sclass.id
-            )
-            if exam_results:
-                sorted_result = sorted(exam_results, key=lambda r: r.exam.date)
-                for result in sorted_result:
-                    status = ""
-                    if result.exam.date > datetime.date.today():
-                        status = "prova agendada"
-                    elif result.grade is None:
-                        status = "nota não registrada"
-                    elif result.grade:
-                        status = f"nota {result.grade}"
-
-                    print(f"        [{result.exam.date}] {result.exam.name} ({status})")
+            if item.exams:
+                for entry in item.exams:
+                    print(
+                        f"        [{entry.exam.date}] {entry.exam.name} ({entry.describe()})"
+                    )
             else:
                 print("    📭 Nenhum prova ou nota disponível.")
 
     def consultar_presencas(self, student: Student):
-        student_sclasses = self.sclass_repo.get_student_sclasses(student.id)
+        class_attendance = self.get_student_attendance(student)
 
         print("📅 Presenças:")
-        if not student_sclasses:
+        if not class_attendance:
             print("    📭 O(A) não foi cadastrado(a) em uma turma.")
 
-        for sclass in student_sclasses:
+        for item in class_attendance:
+            sclass = item.sclass
             print(f"🏫 Turma {sclass.name} ({sclass.get_schedule()})")
 
-            ats = self.attendance_repo.get_student_attendance_for_class(student, sclass)
-            if ats is not None:
+            if item.attendance is not None:
                 print(
-                    f"    ✅ Presença (%): {(ats * 100):.2f} (registradas {sclass.n_classes_passed} aulas)"
+                    f"    ✅ Presença (%): {(item.attendance * 100):.2f} (registradas {sclass.n_classes_passed} aulas)"
                 )
             else:
                 print("    📭 Nenhuma presença registrada para essa turma.")
 
     def consultar_ecas(self, student: Student):
-        student_ecas = self.eca_repo.get_student_ecas(student.id)
+        student_ecas = self.get_student_ecas(student)
         print("🎯 Atividades extracurriculares:")
         if student_ecas:
             for eca in student_ecas:
@@ -227,10 +549,8 @@ class School:
             print("    📭 O aluno não participa de nenhuma atividade extracurricular.")
 
     def consultar_turmas(self, student: Student):
-        student_sclasses = self.sclass_repo.get_student_sclasses(student.id)
-
         print("🏫 Turmas:")
-        for sclass in student_sclasses:
+        for sclass in self.get_student_classes(student):
             print(f"    {sclass.name} ({sclass.get_schedule()})")
 
     def processar_pagamento(self, student: Student, method: PaymentMethod):
@@ -255,8 +575,15 @@ class School:
 
     def criar_turma(self, sclass: SchoolClass):
         self.sclass_repo.create_sclass(sclass)
+        self.record("criar_turma", **sclass_to_record(sclass))
         print(f"🧑‍🏫 Turma '{sclass.name}' criada no horário {sclass.get_schedule()}")
 
+    def criar_turmas(self, sclasses: list[SchoolClass]):
+        for sclass in sclasses:
+            self.sclass_repo.create_sclass(sclass)
+
+        self.record("criar_turmas", sclasses=[sclass_to_record(s) for s in sclasses])
+
     def get_alunos(self) -> list[Student]:
         return self.user_repo.get_students()
 
@@ -271,7 +598,8 @@ class School:
         )
 
         if exam:
-            exam.grades_submitted = True
+            self.exam_repo.submit_grades(exam)
+            self.record("submit_grades", exam_id=exam.id)
             print(f"Registre a nota dos alunos na prova {exam.name}:")
             for student in sclass.students:
                 while True:
@@ -290,20 +618,22 @@ class School:
                         print(f"    {e}")
 
     def add_students_to_sclass(self, sclass: SchoolClass, students: list[Student]):
-        for student in students:
-            sclass.students.append(student)
+        enroll_students(self, sclass, students, sclass.n_classes_passed)
 
-            # Cria provas para novo aluno
-            for exam in self.exam_repo.get_class_exams(sclass.id):
-                if exam.grades_submitted:
-                    grade = 10.0
-                else:
-                    grade = None
-
-                self.exam_repo.register_grade(exam, student, grade, force=True)
+        self.record(
+            "add_students_to_sclass",
+            sclass_id=sclass.id,
+            student_ids=[s.id for s in students],
+            n_classes_credited=sclass.n_classes_passed,
+        )
 
-            for _ in range(sclass.n_classes_passed):
-                self.attendance_repo.register_attendance(student, sclass)
+    def add_students_to_eca(self, eca: ECA, students: list[Student]):
+        self.eca_repo.add_students(eca.id, students)
+        self.record(
+            "add_students_to_eca",
+            eca_id=eca.id,
+            student_ids=[s.id for s in students],
+        )
 
     def populate(self):
         aluno1 = Student("João", "123")
@@ -345,7 +675,7 @@ class School:
 
         self.exam_repo.register_grade(prova1_turma1, aluno1, 7.5)
         self.exam_repo.register_grade(prova1_turma1, aluno2, 10.0)
-        prova1_turma1.grades_submitted = True
+        self.exam_repo.submit_grades(prova1_turma1)
 
         prova2_turma1 = Exam(
             turma1, "Prova 2 - Análise Combinatória", datetime.date(2025, 9, 26)
@@ -0,0 +1,719 @@
+import datetime
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator
+
+from exceptions import InvalidCredentialsException
+from system import (
+    ECA,
+    Attendance,
+    Employee,
+    Exam,
+    Guardian,
+    Resource,
+    SchoolClass,
+    Student,
+    StudentExamResult,
+    User,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    position TEXT,
+    subject TEXT,
+    student_id INTEGER REFERENCES users(id)
+);
+CREATE INDEX IF NOT EXISTS idx_users_name ON users(name, id);
+CREATE INDEX IF NOT EXISTS idx_users_type ON users(type, id);
+
+CREATE TABLE IF NOT EXISTS sclasses (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    teacher_id INTEGER NOT NULL REFERENCES users(id),
+    schedule TEXT NOT NULL,
+    n_classes_total INTEGER NOT NULL DEFAULT 0,
+    n_classes_passed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sclasses_teacher ON sclasses(teacher_id, id);
+
+CREATE TABLE IF NOT EXISTS sclass_students (
+    sclass_id INTEGER NOT NULL REFERENCES sclasses(id),
+    student_id INTEGER NOT NULL REFERENCES users(id),
+    UNIQUE (sclass_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS idx_sclass_students_student
+    ON sclass_students(student_id, sclass_id);
+
+CREATE TABLE IF NOT EXISTS resources (
+    id INTEGER PRIMARY KEY,
+    sclass_id INTEGER NOT NULL REFERENCES sclasses(id),
+    name TEXT NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resources_sclass ON resources(sclass_id, id);
+
+CREATE TABLE IF NOT EXISTS exams (
+    id INTEGER PRIMARY KEY,
+    sclass_id INTEGER NOT NULL REFERENCES sclasses(id),
+    name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    grades_submitted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_exams_sclass ON exams(sclass_id, id);
+
+CREATE TABLE IF NOT EXISTS exam_results (
+    exam_id INTEGER NOT NULL REFERENCES exams(id),
+    student_id INTEGER NOT NULL REFERENCES users(id),
+    grade REAL,
+    PRIMARY KEY (exam_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS idx_exam_results_student
+    ON exam_results(student_id, exam_id);
+
+CREATE TABLE IF NOT EXISTS attendance (
+    student_id INTEGER NOT NULL,
+    sclass_id INTEGER NOT NULL,
+    date INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_student_sclass
+    ON attendance(student_id, sclass_id);
+
+CREATE TABLE IF NOT EXISTS attendance_credits (
+    student_id INTEGER NOT NULL,
+    sclass_id INTEGER NOT NULL,
+    credit INTEGER NOT NULL,
+    PRIMARY KEY (student_id, sclass_id)
+);
+
+CREATE TABLE IF NOT EXISTS ecas (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    teacher_id INTEGER NOT NULL REFERENCES users(id),
+    schedule TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ecas_teacher ON ecas(teacher_id, id);
+
+CREATE TABLE IF NOT EXISTS eca_students (
+    eca_id INTEGER NOT NULL REFERENCES ecas(id),
+    student_id INTEGER NOT NULL REFERENCES users(id),
+    UNIQUE (eca_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS idx_eca_students_student
+    ON eca_students(student_id, eca_id);
+"""
+
+
+class SQLiteDatabase:
+    """
+    Conexão compartilhada pelos repositórios SQLite. O banco roda em modo WAL e
+    todas as operações passam por um lock, pois a conexão é usada por várias
+    threads. As consultas usam SQL constante, então o cache de statements do
+    sqlite3 reaproveita os statements já preparados.
+    """
+
+    __connection: sqlite3.Connection
+    __lock: threading.RLock
+
+    def __init__(self, path: str):
+        self.__connection = sqlite3.connect(
+            path, check_same_thread=False, cached_statements=256
+        )
+        self.__lock = threading.RLock()
+
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute("PRAGMA foreign_keys=ON")
+        self.__connection.executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.__lock, self.__connection:
+            yield self.__connection
+
+    def fetch_all(self, sql: str, params: Iterable[Any] = ()) -> list[tuple]:
+        with self.__lock:
+            return self.__connection.execute(sql, tuple(params)).fetchall()
+
+    def fetch_one(self, sql: str, params: Iterable[Any] = ()) -> tuple | None:
+        with self.__lock:
+            return self.__connection.execute(sql, tuple(params)).fetchone()
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+
+class SQLiteUserRepository:
+    INSERT_USER = (
+        "INSERT INTO users (type, name, password, position, subject, student_id) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+    USER_COLUMNS = (
+        "users.id, users.type, users.name, users.password, users.position, "
+        "users.subject, users.student_id"
+    )
+    SELECT_USER = f"SELECT {USER_COLUMNS} FROM users WHERE id = ?"
+    SELECT_BY_NAME = "SELECT id FROM users WHERE name = ? ORDER BY id LIMIT 1"
+    SELECT_BY_TYPE = f"SELECT {USER_COLUMNS} FROM users WHERE type = ? ORDER BY id"
+    SELECT_ANY = "SELECT 1 FROM users LIMIT 1"
+
+    __db: SQLiteDatabase
+    __users: dict[int, User]
+
+    def __init__(self, db: SQLiteDatabase):
+        self.__db = db
+        self.__users = {}
+
+    def __user_params(self, user: User) -> tuple:
+        position = subject = student_id = None
+        if isinstance(user, Employee):
+            user_type = "employee"
+            position, subject = user.position, user.subject
+        elif isinstance(user, Guardian):
+            user_type = "guardian"
+            student_id = user.student.id
+        else:
+            user_type = "student"
+
+        return (user_type, user.name, user.password, position, subject, student_id)
+
+    def add_user(self, user: User) -> int:
+        return self.add_users([user])[0]
+
+    def add_users(self, users: Iterable[User]) -> list[int]:
+        users = list(users)
+        with self.__db.transaction() as conn:
+            for user in users:
+                cursor = conn.execute(self.INSERT_USER, self.__user_params(user))
+                user.id = cursor.lastrowid
+
+        for user in users:
+            self.__users.update({user.id: user})
+
+        return [user.id for user in users]
+
+    def get_user(self, user_id: int) -> User | None:
+        if user_id in self.__users:
+            return self.__users[user_id]
+
+        row = self.__db.fetch_one(self.SELECT_USER, (user_id,))
+        if row is None:
+            return None
+
+        return self.hydrate(row)
+
+    def hydrate(self, row: tuple) -> User:
+        """
+        Usuário de uma linha com as colunas de USER_COLUMNS, reaproveitando o
+        objeto já carregado com o mesmo id.
+        """
+        user_id, user_type, name, password, position, subject, student_id = row
+        if user_id in self.__users:
+            return self.__users[user_id]
+
+        match user_type:
+            case "employee":
+                user = Employee(name, password, position, subject)
+            case "guardian":
+                user = Guardian(name, password, self.get_user(student_id))
+            case _:
+                user = Student(name, password)
+
+        user.id = user_id
+        self.__users.update({user_id: user})
+        return user
+
+    def validate_user(self, name: str, password: str) -> User:
+        row = self.__db.fetch_one(self.SELECT_BY_NAME, (name,))
+        if not row:
+            raise InvalidCredentialsException("Usuário não encontrado.")
+
+        selected_user = self.get_user(row[0])
+        if selected_user.password != password:
+            raise InvalidCredentialsException("Senha errada.")
+
+        return selected_user
+
+    def is_empty(self) -> bool:
+        return self.__db.fetch_one(self.SELECT_ANY) is None
+
+    def get_students(self) -> list[Student]:
+        rows = self.__db.fetch_all(self.SELECT_BY_TYPE, ("student",))
+        return [self.hydrate(row) for row in rows]
+
+
+class SQLiteSchoolClassRepository:
+    INSERT_SCLASS = (
+        "INSERT INTO sclasses (name, teacher_id, schedule, n_classes_total, "
+        "n_classes_passed) VALUES (?, ?, ?, ?, ?)"
+    )
+    INSERT_STUDENT = (
+        "INSERT OR IGNORE INTO sclass_students (sclass_id, student_id) VALUES (?, ?)"
+    )
+    INSERT_RESOURCE = "INSERT INTO resources (sclass_id, name, url) VALUES (?, ?, ?)"
+    SELECT_SCLASS = (
+        "SELECT id, name, teacher_id, schedule, n_classes_total, n_classes_passed "
+        "FROM sclasses WHERE id = ?"
+    )
+    SELECT_STUDENTS = (
+        f"SELECT {SQLiteUserRepository.USER_COLUMNS} FROM sclass_students "
+        "JOIN users ON users.id = sclass_students.student_id "
+        "WHERE sclass_students.sclass_id = ? ORDER BY sclass_students.rowid"
+    )
+    SELECT_RESOURCES = "SELECT name, url FROM resources WHERE sclass_id = ? ORDER BY id"
+    SELECT_BY_TEACHER = "SELECT id FROM sclasses WHERE teacher_id = ? ORDER BY id"
+    SELECT_BY_STUDENT = (
+        "SELECT sclass_id FROM sclass_students WHERE student_id = ? ORDER BY sclass_id"
+    )
+    SELECT_MEMBERSHIP = (
+        "SELECT 1 FROM sclass_students WHERE student_id = ? AND sclass_id = ?"
+    )
+    UPDATE_CLASSES_PASSED = (
+        "UPDATE sclasses SET n_classes_passed = n_classes_passed + 1 WHERE id = ?"
+    )
+
+    __db: SQLiteDatabase
+    __user_repo: SQLiteUserRepository
+    __classes: dict[int, SchoolClass]
+
+    def __init__(self, db: SQLiteDatabase, user_repo: SQLiteUserRepository):
+        self.__db = db
+        self.__user_repo = user_repo
+        self.__classes = {}
+
+    def create_sclass(self, sclass: SchoolClass) -> int:
+        with self.__db.transaction() as conn:
+            cursor = conn.execute(
+                self.INSERT_SCLASS,
+                (
+                    sclass.name,
+                    sclass.teacher.id,
+                    sclass.schedule.isoformat(),
+                    sclass.n_classes_total,
+                    sclass.n_classes_passed,
+                ),
+            )
+            sclass.id = cursor.lastrowid
+            conn.executemany(
+                self.INSERT_STUDENT, [(sclass.id, s.id) for s in sclass.students]
+            )
+            conn.executemany(
+                self.INSERT_RESOURCE,
+                [(sclass.id, r.name, r.url) for r in sclass.resources],
+            )
+
+        self.__classes.update({sclass.id: sclass})
+        return sclass.id
+
+    def get_sclass(self, sclass_id: int) -> SchoolClass | None:
+        if sclass_id in self.__classes:
+            return self.__classes[sclass_id]
+
+        row = self.__db.fetch_one(self.SELECT_SCLASS, (sclass_id,))
+        if row is None:
+            return None
+
+        sclass_id, name, teacher_id, schedule, n_total, n_passed = row
+        student_rows = self.__db.fetch_all(self.SELECT_STUDENTS, (sclass_id,))
+        resource_rows = self.__db.fetch_all(self.SELECT_RESOURCES, (sclass_id,))
+
+        sclass = SchoolClass(
+            name=name,
+            teacher=self.__user_repo.get_user(teacher_id),
+            schedule=datetime.time.fromisoformat(schedule),
+            students=[self.__user_repo.hydrate(row) for row in student_rows],
+            resources=[Resource(r_name, url) for r_name, url in resource_rows],
+            n_classes_total=n_total,
+            n_classes_passed=n_passed,
+        )
+        sclass.id = sclass_id
+        self.__classes.update({sclass_id: sclass})
+        return sclass
+
+    def add_students(
+        self, sclass_id: int, students: Iterable[Student]
+    ) -> list[Student]:
+        sclass = self.get_sclass(sclass_id)
+
+        # Só entram na lista em memória as matrículas que o banco aceitou
+        inserted: list[Student] = []
+        with self.__db.transaction() as conn:
+            for student in students:
+                cursor = conn.execute(self.INSERT_STUDENT, (sclass_id, student.id))
+                if cursor.rowcount:
+                    inserted.append(student)
+
+        sclass.students.extend(inserted)
+        return inserted
+
+    def get_teacher_sclasses(self, teacher_id: int) -> list[SchoolClass]:
+        rows = self.__db.fetch_all(self.SELECT_BY_TEACHER, (teacher_id,))
+        return [self.get_sclass(sclass_id) for (sclass_id,) in rows]
+
+    def add_resource(self, sclass_id: int, resource: Resource):
+        with self.__db.transaction() as conn:
+            conn.execute(self.INSERT_RESOURCE, (sclass_id, resource.name, resource.url))
+
+        self.get_sclass(sclass_id).resources.append(resource)
+
+    def register_class_given(self, sclass_id: int):
+        with self.__db.transaction() as conn:
+            conn.execute(self.UPDATE_CLASSES_PASSED, (sclass_id,))
+
+        self.get_sclass(sclass_id).n_classes_passed += 1
+
+    def get_student_sclasses(self, student_id: int) -> list[SchoolClass]:
+        rows = self.__db.fetch_all(self.SELECT_BY_STUDENT, (student_id,))
+        return [self.get_sclass(sclass_id) for (sclass_id,) in rows]
+
+    def is_student_in_sclass(self, student_id: int, sclass_id: int) -> bool:
+        row = self.__db.fetch_one(self.SELECT_MEMBERSHIP, (student_id, sclass_id))
+        return row is not None
+
+
+class SQLiteExamRepository:
+    INSERT_EXAM = (
+        "INSERT INTO exams (sclass_id, name, date, grades_submitted) "
+        "VALUES (?, ?, ?, ?)"
+    )
+    INSERT_RESULT = (
+        "INSERT OR IGNORE INTO exam_results (exam_id, student_id, grade) "
+        "VALUES (?, ?, NULL)"
+    )
+    UPSERT_GRADE = (
+        "INSERT INTO exam_results (exam_id, student_id, grade) VALUES (?, ?, ?) "
+        "ON CONFLICT (exam_id, student_id) DO UPDATE SET grade = excluded.grade"
+    )
+    UPDATE_GRADE = (
+        "UPDATE exam_results SET grade = ? WHERE exam_id = ? AND student_id = ?"
+    )
+    UPDATE_SUBMITTED = "UPDATE exams SET grades_submitted = 1 WHERE id = ?"
+    SELECT_EXAM = (
+        "SELECT id, sclass_id, name, date, grades_submitted FROM exams WHERE id = ?"
+    )
+    SELECT_CLASS_EXAMS = "SELECT id FROM exams WHERE sclass_id = ? ORDER BY id"
+    SELECT_CLASS_EXAMS_WITHOUT_GRADE = (
+        "SELECT id FROM exams WHERE sclass_id = ? AND grades_submitted = 0 "
+        "ORDER BY id"
+    )
+    SELECT_BY_STUDENT = (
+        "SELECT exam_id, student_id, grade FROM exam_results "
+        "WHERE student_id = ? ORDER BY exam_id"
+    )
+    SELECT_BY_STUDENT_SCLASS = (
+        "SELECT r.exam_id, r.student_id, r.grade FROM exam_results r "
+        "JOIN exams e ON e.id = r.exam_id "
+        "WHERE r.student_id = ? AND e.sclass_id = ? ORDER BY r.exam_id"
+    )
+    SELECT_BY_EXAM = (
+        "SELECT exam_id, student_id, grade FROM exam_results "
+        "WHERE exam_id = ? ORDER BY rowid"
+    )
+
+    __db: SQLiteDatabase
+    __user_repo: SQLiteUserRepository
+    __sclass_repo: SQLiteSchoolClassRepository
+    __exams: dict[int, Exam]
+
+    def __init__(
+        self,
+        db: SQLiteDatabase,
+        user_repo: SQLiteUserRepository,
+        sclass_repo: SQLiteSchoolClassRepository,
+    ):
+        self.__db = db
+        self.__user_repo = user_repo
+        self.__sclass_repo = sclass_repo
+        self.__exams = {}
+
+    def create_exam(self, sclass: SchoolClass, exam: Exam) -> int:
+        with self.__db.transaction() as conn:
+            cursor = conn.execute(
+                self.INSERT_EXAM,
+                (
+                    exam.sclass.id,
+                    exam.name,
+                    exam.date.isoformat(),
+                    int(exam.grades_submitted),
+                ),
+            )
+            exam.id = cursor.lastrowid
+            conn.executemany(
+                self.INSERT_RESULT, [(exam.id, s.id) for s in sclass.students]
+            )
+
+        self.__exams.update({exam.id: exam})
+        return exam.id
+
+    def get_exam(self, exam_id: int) -> Exam | None:
+        if exam_id in self.__exams:
+            return self.__exams[exam_id]
+
+        row = self.__db.fetch_one(self.SELECT_EXAM, (exam_id,))
+        if row is None:
+            return None
+
+        exam_id, sclass_id, name, date, grades_submitted = row
+        exam = Exam(
+            self.__sclass_repo.get_sclass(sclass_id),
+            name,
+            datetime.date.fromisoformat(date),
+            bool(grades_submitted),
+        )
+        exam.id = exam_id
+        self.__exams.update({exam_id: exam})
+        return exam
+
+    def register_grade(
+        self, exam: Exam, student: Student, grade: float | None, force: bool = False
+    ):
+        with self.__db.transaction() as conn:
+            if force:
+                conn.execute(self.UPSERT_GRADE, (exam.id, student.id, grade))
+                return
+
+            cursor = conn.execute(self.UPDATE_GRADE, (grade, exam.id, student.id))
+            if cursor.rowcount == 0:
+                raise ValueError("Aluno não está cadastrado na prova.")
+
+    def register_grades(
+        self,
+        exam: Exam,
+        students: Iterable[Student],
+        grade: float | None,
+        force: bool = False,
+    ):
+        if not force:
+            for student in students:
+                self.register_grade(exam, student, grade)
+            return
+
+        with self.__db.transaction() as conn:
+            conn.executemany(
+                self.UPSERT_GRADE, [(exam.id, s.id, grade) for s in students]
+            )
+
+    def register_grade_sheet(self, exam: Exam, grades: dict[Student, float | None]):
+        with self.__db.transaction() as conn:
+            cursor = conn.executemany(
+                self.UPDATE_GRADE,
+                [(grade, exam.id, student.id) for student, grade in grades.items()],
+            )
+            if cursor.rowcount < len(grades):
+                raise ValueError("Aluno não está cadastrado na prova.")
+
+    def submit_grades(self, exam: Exam):
+        with self.__db.transaction() as conn:
+            conn.execute(self.UPDATE_SUBMITTED, (exam.id,))
+
+        exam.grades_submitted = True
+
+    def __results(self, rows: list[tuple]) -> list[StudentExamResult]:
+        return [
+            StudentExamResult(
+                student=self.__user_repo.get_user(student_id),
+                exam=self.get_exam(exam_id),
+                grade=grade,
+            )
+            for exam_id, student_id, grade in rows
+        ]
+
+    def get_class_exams(self, sclass_id: int) -> list[Exam]:
+        rows = self.__db.fetch_all(self.SELECT_CLASS_EXAMS, (sclass_id,))
+        return [self.get_exam(exam_id) for (exam_id,) in rows]
+
+    def get_class_exams_without_grade(self, sclass_id: int) -> list[Exam]:
+        rows = self.__db.fetch_all(self.SELECT_CLASS_EXAMS_WITHOUT_GRADE, (sclass_id,))
+        return [self.get_exam(exam_id) for (exam_id,) in rows]
+
+    def get_student_exam_results(self, student_id: int) -> list[StudentExamResult]:
+        rows = self.__db.fetch_all(self.SELECT_BY_STUDENT, (student_id,))
+        return self.__results(rows)
+
+    def get_student_exam_result_in_class(
+        self, student_id: int, sclass_id: int
+    ) -> list[StudentExamResult]:
+        rows = self.__db.fetch_all(
+            self.SELECT_BY_STUDENT_SCLASS, (student_id, sclass_id)
+        )
+        return self.__results(rows)
+
+    def get_students_exams(self, exam_id: int) -> list[StudentExamResult]:
+        return self.__results(self.__db.fetch_all(self.SELECT_BY_EXAM, (exam_id,)))
+
+
+class SQLiteAttendanceRepository:
+    INSERT_ATTENDANCE = (
+        "INSERT INTO attendance (student_id, sclass_id, date) VALUES (?, ?, ?)"
+    )
+    UPSERT_CREDIT = (
+        "INSERT INTO attendance_credits (student_id, sclass_id, credit) "
+        "VALUES (?, ?, ?) ON CONFLICT (student_id, sclass_id) "
+        "DO UPDATE SET credit = credit + excluded.credit"
+    )
+    SELECT_COUNT = (
+        "SELECT (SELECT COUNT(*) FROM attendance "
+        "WHERE student_id = ?1 AND sclass_id = ?2) + "
+        "COALESCE((SELECT credit FROM attendance_credits "
+        "WHERE student_id = ?1 AND sclass_id = ?2), 0)"
+    )
+    SELECT_STUDENT_COUNTS = (
+        "SELECT sclass_id, SUM(n) FROM ("
+        "SELECT sclass_id, COUNT(*) AS n FROM attendance WHERE student_id = ?1 "
+        "GROUP BY sclass_id "
+        "UNION ALL "
+        "SELECT sclass_id, credit AS n FROM attendance_credits WHERE student_id = ?1"
+        ") GROUP BY sclass_id ORDER BY sclass_id"
+    )
+    SELECT_DATES = (
+        "SELECT date FROM attendance WHERE student_id = ? AND sclass_id = ? "
+        "ORDER BY rowid"
+    )
+
+    __db: SQLiteDatabase
+    __sclass_repo: SQLiteSchoolClassRepository
+
+    def __init__(self, db: SQLiteDatabase, sclass_repo: SQLiteSchoolClassRepository):
+        self.__db = db
+        self.__sclass_repo = sclass_repo
+
+    def register_attendance(
+        self,
+        student: Student,
+        sclass: SchoolClass,
+        date: datetime.date | None = None,
+    ) -> Attendance:
+        at = Attendance(student, sclass, date or datetime.date.today())
+
+        with self.__db.transaction() as conn:
+            conn.execute(
+                self.INSERT_ATTENDANCE, (student.id, sclass.id, at.date.toordinal())
+            )
+
+        return at
+
+    def credit_attendance(
+        self, students: Iterable[Student], sclass: SchoolClass, n_classes: int
+    ):
+        if n_classes <= 0:
+            return
+
+        with self.__db.transaction() as conn:
+            conn.executemany(
+                self.UPSERT_CREDIT, [(s.id, sclass.id, n_classes) for s in students]
+            )
+
+    def get_student_attendance_for_class(
+        self, student: Student, sclass: SchoolClass
+    ) -> float | None:
+        if sclass.n_classes_passed == 0:
+            return
+
+        (count,) = self.__db.fetch_one(self.SELECT_COUNT, (student.id, sclass.id))
+        return count / sclass.n_classes_passed
+
+    def get_student_attendances(
+        self, student: Student
+    ) -> list[tuple[SchoolClass, float]]:
+        result: list[tuple[SchoolClass, float]] = []
+        for sclass_id, count in self.__db.fetch_all(
+            self.SELECT_STUDENT_COUNTS, (student.id,)
+        ):
+            sclass = self.__sclass_repo.get_sclass(sclass_id)
+            if sclass.n_classes_passed == 0:
+                continue
+
+            result.append((sclass, count / sclass.n_classes_passed))
+
+        return result
+
+    def get_student_attendance_dates(
+        self, student: Student, sclass: SchoolClass
+    ) -> list[datetime.date]:
+        rows = self.__db.fetch_all(self.SELECT_DATES, (student.id, sclass.id))
+        return [datetime.date.fromordinal(ordinal) for (ordinal,) in rows]
+
+
+class SQLiteECARepository:
+    INSERT_ECA = "INSERT INTO ecas (name, teacher_id, schedule) VALUES (?, ?, ?)"
+    INSERT_STUDENT = (
+        "INSERT OR IGNORE INTO eca_students (eca_id, student_id) VALUES (?, ?)"
+    )
+    SELECT_ECA = "SELECT id, name, teacher_id, schedule FROM ecas WHERE id = ?"
+    SELECT_STUDENTS = (
+        f"SELECT {SQLiteUserRepository.USER_COLUMNS} FROM eca_students "
+        "JOIN users ON users.id = eca_students.student_id "
+        "WHERE eca_students.eca_id = ? ORDER BY eca_students.rowid"
+    )
+    SELECT_BY_TEACHER = "SELECT id FROM ecas WHERE teacher_id = ? ORDER BY id"
+    SELECT_BY_STUDENT = (
+        "SELECT eca_id FROM eca_students WHERE student_id = ? ORDER BY eca_id"
+    )
+
+    __db: SQLiteDatabase
+    __user_repo: SQLiteUserRepository
+    __ecas: dict[int, ECA]
+
+    def __init__(self, db: SQLiteDatabase, user_repo: SQLiteUserRepository):
+        self.__db = db
+        self.__user_repo = user_repo
+        self.__ecas = {}
+
+    def create_eca(self, eca: ECA) -> int:
+        with self.__db.transaction() as conn:
+            cursor = conn.execute(
+                self.INSERT_ECA,
+                (eca.name, eca.teacher.id, eca.schedule.isoformat()),
+            )
+            eca.id = cursor.lastrowid
+            conn.executemany(
+                self.INSERT_STUDENT, [(eca.id, s.id) for s in eca.students]
+            )
+
+        self.__ecas.update({eca.id: eca})
+        return eca.id
+
+    def get_eca(self, eca_id: int) -> ECA | None:
+        if eca_id in self.__ecas:
+            return self.__ecas[eca_id]
+
+        row = self.__db.fetch_one(self.SELECT_ECA, (eca_id,))
+        if row is None:
+            return None
+
+        eca_id, name, teacher_id, schedule = row
+        student_rows = self.__db.fetch_all(self.SELECT_STUDENTS, (eca_id,))
+        eca = ECA(
+            name=name,
+            teacher=self.__user_repo.get_user(teacher_id),
+            schedule=datetime.time.fromisoformat(schedule),
+            students=[self.__user_repo.hydrate(row) for row in student_rows],
+        )
+        eca.id = eca_id
+        self.__ecas.update({eca_id: eca})
+        return eca
+
+    def add_students(self, eca_id: int, students: Iterable[Student]):
+        eca = self.get_eca(eca_id)
+
+        inserted: list[Student] = []
+        with self.__db.transaction() as conn:
+            for student in students:
+                cursor = conn.execute(self.INSERT_STUDENT, (eca_id, student.id))
+                if cursor.rowcount:
+                    inserted.append(student)
+
+        eca.students.extend(inserted)
+
+    def get_ecas(self, teacher_id: int) -> list[ECA]:
+        rows = self.__db.fetch_all(self.SELECT_BY_TEACHER, (teacher_id,))
+        return [self.get_eca(eca_id) for (eca_id,) in rows]
+
+    def get_student_ecas(self, student_id: int) -> list[ECA]:
+        rows = self.__db.fetch_all(self.SELECT_BY_STUDENT, (student_id,))
+        return [self.get_eca(eca_id) for (eca_id,) in rows]
@@ -10,7 +10,7 @@ class PaymentMethod(StrEnum):
     BOLETO = "Boleto"
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class User(ABC):
     id: int = field(init=False)
     name: str
@@ -24,7 +24,7 @@ class User(ABC):
         pass
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Employee(User):
     position: str
     subject: str | None = None
@@ -37,13 +37,13 @@ class Employee(User):
         return f"Funcionário ({self.position})"
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Student(User):
     def get_type(self):
         return "Aluno"
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Guardian(User):
     student: Student
 
@@ -51,13 +51,19 @@ class Guardian(User):
         return "Responsável"
 
 
-@dataclass
+class ResourceStatus(StrEnum):
+    PROCESSING = "processando"
+    AVAILABLE = "disponível"
+
+
+@dataclass(slots=True)
 class Resource:
     name: str
     url: str
+    status: ResourceStatus = ResourceStatus.AVAILABLE
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Activity(ABC):
     id: int = field(init=False)
     name: str
@@ -69,19 +75,19 @@ class Activity(ABC):
         return self.schedule.strftime("%H:%M")
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class SchoolClass(Activity):
     resources: list[Resource] = field(default_factory=list[Resource])
     n_classes_total: int = 0
     n_classes_passed: int = 0
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class ECA(Activity):
     pass
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Exam:
     id: int = field(init=False)
     sclass: SchoolClass
@@ -90,14 +96,14 @@ class Exam:
     grades_submitted: bool = False
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class StudentExamResult:
     student: Student
     exam: Exam
     grade: float | None = None
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Attendance:
     student: Student
     sclass: SchoolClass
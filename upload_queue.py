@@ -0,0 +1,116 @@
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import Callable
+
+from resource_service import ResourceToFileAdapter
+
+
+class UploadStatus(StrEnum):
+    PENDING = "na fila"
+    RUNNING = "enviando"
+    DONE = "concluído"
+    FAILED = "falhou"
+
+
+@dataclass(eq=False)
+class UploadJob:
+    id: int = field(init=False)
+    path: Path
+    on_done: Callable[["UploadJob"], None] | None = None
+    status: UploadStatus = UploadStatus.PENDING
+    url: str | None = None
+    error: Exception | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    _finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._finished.wait(timeout)
+
+
+class UploadQueue:
+    """
+    Fila de uploads atendida por threads em segundo plano. `submit` retorna na
+    hora com um UploadJob cujo status acompanha o envio; o callback `on_done`
+    do job roda na thread do worker quando o envio termina, com sucesso ou não.
+    """
+
+    def __init__(self, adapter: ResourceToFileAdapter, n_workers: int = 2):
+        self._adapter = adapter
+        self._queue: queue.Queue[UploadJob | None] = queue.Queue()
+        self._jobs: dict[int, UploadJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"upload-{i}", daemon=True)
+            for i in range(n_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self, str_path: str, on_done: Callable[[UploadJob], None] | None = None
+    ) -> UploadJob:
+        """Valida o arquivo na hora e enfileira o envio."""
+        path = Path(str_path).resolve()
+
+        if not path.exists():
+            raise FileNotFoundError("O arquivo não existe.")
+
+        if path.is_dir():
+            raise ValueError("O path representa um diretório.")
+
+        job = UploadJob(path, on_done)
+        with self._lock:
+            job.id = next(self._ids)
+            self._jobs[job.id] = job
+
+        self._queue.put(job)
+        return job
+
+    def get_job(self, job_id: int) -> UploadJob | None:
+        return self._jobs.get(job_id)
+
+    def get_jobs(self) -> list[UploadJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _work(self):
+        while (job := self._queue.get()) is not None:
+            job.status = UploadStatus.RUNNING
+            try:
+                job.url = self._adapter.upload_from_path(str(job.path))
+                job.status = UploadStatus.DONE
+            except Exception as e:
+                job.error = e
+                job.status = UploadStatus.FAILED
+
+            job.finished_at = time.time()
+            if job.on_done:
+                try:
+                    job.on_done(job)
+                except Exception as e:
+                    print(f"❌ Erro ao concluir o envio #{job.id}: {e}")
+
+            job._finished.set()
+            self._queue.task_done()
+
+        self._queue.task_done()
+
+    def join(self):
+        """Espera todos os envios enfileirados terminarem."""
+        self._queue.join()
+
+    def shutdown(self, wait: bool = True):
+        """Encerra os workers depois dos envios já enfileirados."""
+        for _ in self._workers:
+            self._queue.put(None)
+
+        if wait:
+            for worker in self._workers:
+                worker.join()